@@ -0,0 +1,172 @@
+"""바이트 단위로 제한되는 답변 캐시와 판정 플라이웨이트
+
+judge_question이 돌려주는 (verdict, evidence, nl) 조합은 수십 가지뿐이므로
+결과 dict를 항목마다 새로 만들지 않고 공유 불변 객체로 인터닝합니다.
+캐시 항목은 키 문자열 + 항목 오버헤드만 차지하며, 그 합이 max_bytes를 넘지 않습니다.
+"""
+import heapq
+import sys
+import threading
+import tracemalloc
+from collections import OrderedDict
+
+
+class Verdict(dict):
+    """공유되는 불변 판정 결과 (dict처럼 읽기만 가능)"""
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Verdict 객체는 공유되므로 수정할 수 없습니다. dict(result)로 복사해서 사용하세요.")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        # 피클/복사 시에는 일반 dict로 (다른 프로세스에는 인터닝 풀이 없음)
+        return (dict, (dict(self),))
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return dict(self)
+
+
+_flyweights = {}
+_flyweights_lock = threading.Lock()
+_flyweight_bytes = 0
+
+
+def intern_verdict(result: dict) -> Verdict:
+    """판정 결과를 공유 플라이웨이트로 변환"""
+    global _flyweight_bytes
+    if isinstance(result, Verdict):
+        return result
+    key = tuple(sorted(result.items()))
+    flyweight = _flyweights.get(key)
+    if flyweight is not None:
+        return flyweight
+    with _flyweights_lock:
+        flyweight = _flyweights.get(key)
+        if flyweight is None:
+            flyweight = Verdict(result)
+            _flyweights[key] = flyweight
+            _flyweight_bytes += sys.getsizeof(flyweight) + sum(
+                sys.getsizeof(k) + sys.getsizeof(v) for k, v in result.items()
+            )
+    return flyweight
+
+
+def flyweight_stats() -> dict:
+    return {"flyweights": len(_flyweights), "flyweight_bytes": _flyweight_bytes}
+
+
+def _measure_entry_overhead(samples: int = 2048) -> int:
+    """캐시 항목 하나가 키 외에 차지하는 바이트 수를 실측"""
+    if tracemalloc.is_tracing():
+        return 104  # 측정 중인 다른 추적을 방해하지 않도록 CPython 3.x 근사값 사용
+    keys = [f"k{i}" for i in range(samples)]
+    value = object()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        # 항목 저장소(OrderedDict) + 적중 횟수 dict를 함께 측정
+        od = OrderedDict()
+        hits = {}
+        for key in keys:
+            od[key] = value
+            hits[key] = 0
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return max(1, (after - before) // samples)
+
+
+ENTRY_OVERHEAD = _measure_entry_overhead()
+
+
+def entry_size(key: str) -> int:
+    return sys.getsizeof(key) + ENTRY_OVERHEAD
+
+
+class AnswerCache:
+    """측정된 바이트 수로 제한되는 스레드 안전 LRU 캐시"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes_used = 0
+        self._entries = OrderedDict()
+        self._hits = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        """캐시 조회 (적중 시 LRU 순서 갱신)"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self._hits[key] += 1
+            return value
+
+    def put(self, key, value) -> int:
+        """캐시 저장 후 밀려난 항목 수 반환"""
+        size = entry_size(key)
+        if size > self.max_bytes:
+            return 0
+        evicted = 0
+        with self._lock:
+            if key in self._entries:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                return 0
+            while self._entries and self.bytes_used + size > self.max_bytes:
+                old_key, _ = self._entries.popitem(last=False)
+                del self._hits[old_key]
+                self.bytes_used -= entry_size(old_key)
+                evicted += 1
+            self._entries[key] = value
+            self._hits[key] = 0
+            self.bytes_used += size
+        return evicted
+
+    def pop(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self.bytes_used -= entry_size(key)
+            del self._hits[key]
+            return self._entries.pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._hits.clear()
+            self.bytes_used = 0
+
+    def items(self):
+        """(키, 값) 목록 - 오래된 것부터 최근 순"""
+        with self._lock:
+            return list(self._entries.items())
+
+    def hottest(self, n: int):
+        """적중 횟수가 많은 순으로 (키, 값) 최대 n개"""
+        with self._lock:
+            keys = heapq.nlargest(n, self._hits, key=self._hits.__getitem__)
+            return [(key, self._entries[key]) for key in keys]
+
+    def memory_stats(self) -> dict:
+        entries = len(self._entries)
+        return {
+            "cache_entries": entries,
+            "cache_bytes": self.bytes_used,
+            "cache_max_bytes": self.max_bytes,
+            "cache_entry_overhead_bytes": ENTRY_OVERHEAD,
+            "cache_avg_entry_bytes": round(self.bytes_used / entries, 1) if entries else 0,
+            **flyweight_stats(),
+        }
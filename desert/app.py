@@ -1,14 +1,37 @@
 import json
 import re
-import difflib
 import time
 import logging
 import os
+import atexit
+import hmac
+import itertools
+import multiprocessing
+import threading
+import uuid
+from collections import OrderedDict
 from pathlib import Path
 from datetime import datetime
-from collections import OrderedDict
 
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+from flask import Flask, Response, render_template, request, jsonify, session, redirect, url_for, g
+
+from answer_cache import AnswerCache, intern_verdict
+from canonical import canonicalize
+from event_store import EventStore, KIND_ASK, KIND_HINT, KIND_GUESS, KIND_RESET
+from cache_snapshot import PeriodicSnapshotter, compute_version, load_snapshot, save_snapshot
+from fallback_model import load_fallback_model
+from file_lock import FileLock
+from hot_reload import FileWatcher
+from json_stream import InvalidCursor, append_item, iter_array, read_page
+from leaderboard import Leaderboard
+from override_index import MappedOverrideIndex, OverrideIndex
+from pattern_lint import minimize_patterns
+from replication import Replicator, default_node_id, make_transport
+from request_log import RequestLogger
+from rule_artifact import artifact_versions, build_artifact, file_signature, load_rule_artifact, rule_constants
+from shadow import ShadowEvaluator, load_engine
+from stages import Stage, StagePipeline
+from tiered import TieredEvaluator
 
 # 로깅 설정 (환경별)
 log_level = logging.WARNING if os.environ.get('FLASK_ENV') == 'production' else logging.INFO
@@ -18,32 +41,124 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 요청별 구조화 로그 (큐 기반 비동기, 고빈도 경로는 표본 추출)
+REQUEST_LOG_ENABLED = os.environ.get('REQUEST_LOG', '1') != '0'
+REQUEST_LOG_SAMPLE_RATE = float(os.environ.get('REQUEST_LOG_SAMPLE_RATE', '1.0'))
+REQUEST_LOG_QUEUE_SIZE = int(os.environ.get('REQUEST_LOG_QUEUE_SIZE', '10000'))
+HIGH_VOLUME_ROUTES = {'/ask', '/state'}
+request_log = RequestLogger(max_queue=REQUEST_LOG_QUEUE_SIZE, sample_rate=REQUEST_LOG_SAMPLE_RATE)
+
 # 전역 변수
 BASE_DIR = Path(__file__).parent
 LEARNED_OVERRIDES_FILE = BASE_DIR / "learned_overrides.json"
 ANSWER_FEEDBACK_FILE = BASE_DIR / "answer_feedback.json"
+FALLBACK_MODEL_FILE = BASE_DIR / "fallback_model.npz"
+CACHE_SNAPSHOT_FILE = BASE_DIR / "cache_snapshot.json"
+RULE_ARTIFACT_FILE = BASE_DIR / "rules.bin"
+REPLICATION_STATE_FILE = BASE_DIR / "replication_state.json"
+LEADERBOARD_DB_FILE = Path(os.environ.get('LEADERBOARD_DB', str(BASE_DIR / "leaderboard.db")))
+EVENT_DB_FILE = Path(os.environ.get('EVENT_DB', str(BASE_DIR / "events.db")))
+SHADOW_DIFF_LOG_FILE = Path(os.environ.get('SHADOW_DIFF_LOG', str(BASE_DIR / "shadow_diff.jsonl")))
+
+# 오버라이드 유사 일치: 공백/문장부호를 빼고 자모로 분해한 편집 거리 OVERRIDE_FUZZY_DISTANCE 이내
+# 자모 하나로도 뜻이 바뀔 수 있으므로(죽었나요/죽였나요) 기본은 비활성화(0)
+OVERRIDE_FUZZY_DISTANCE = int(os.environ.get('OVERRIDE_FUZZY_DISTANCE', '0'))
+OVERRIDE_FUZZY_MIN_LENGTH = int(os.environ.get('OVERRIDE_FUZZY_MIN_LENGTH', '6'))
+
+# 컴파일된 아티팩트(rule_artifact.py build)가 현재 오버라이드 파일과 일치하면 mmap으로 공유하고
+# JSON은 파싱하지 않음 (오버라이드 수와 관계없이 시작 시간 일정)
+_rule_artifact = load_rule_artifact(RULE_ARTIFACT_FILE, LEARNED_OVERRIDES_FILE,
+                                    OVERRIDE_FUZZY_DISTANCE, OVERRIDE_FUZZY_MIN_LENGTH)
+# 아티팩트를 빌드해 둔 배포에서는 /feedback으로 오버라이드를 쓸 때마다 아티팩트도 다시 빌드
+RULE_ARTIFACT_ENABLED = _rule_artifact is not None or bool(artifact_versions(RULE_ARTIFACT_FILE))
+
+# 오버라이드 파일 읽기-수정-쓰기는 워커 프로세스끼리도 이 잠금 안에서만
+_overrides_file_lock = FileLock(LEARNED_OVERRIDES_FILE)
+# 정답 피드백은 파일 끝에 추가만 하므로 추가하는 동안만 잠금
+_answer_feedback_lock = FileLock(ANSWER_FEEDBACK_FILE)
+
+def _overrides_file_signature():
+    try:
+        return file_signature(LEARNED_OVERRIDES_FILE)
+    except FileNotFoundError:
+        return None
+
+# 인덱스에 반영된 오버라이드 파일의 서명 (이 프로세스가 직접 쓴 변경은 파일 감시에서 다시 읽지 않도록)
+_overrides_signature = _rule_artifact.meta["overrides_signature"] if _rule_artifact else _overrides_file_signature()
+
+# 학습된 오버라이드 로드 (아티팩트를 쓰지 않을 때만)
+LEARNED_OVERRIDES = None
+if _rule_artifact is None:
+    try:
+        with open(LEARNED_OVERRIDES_FILE, "r", encoding="utf-8") as f:
+            LEARNED_OVERRIDES = json.load(f)
+    except FileNotFoundError:
+        LEARNED_OVERRIDES = []
+
+# 학습된 폴백 분류기 로드 (fallback_model.py train 으로 생성, 없으면 비활성화)
+FALLBACK_MODEL = load_fallback_model(FALLBACK_MODEL_FILE)
+FALLBACK_MIN_CONFIDENCE = float(os.environ.get('FALLBACK_MIN_CONFIDENCE', '0.8'))
+
+# 판정 데이터가 교체될 때마다 증가 (교체 전에 계산된 결과가 캐시에 들어가지 않도록)
+_rules_generation = 0
+_reload_lock = threading.Lock()
+HOT_RELOAD_INTERVAL = float(os.environ.get('HOT_RELOAD_INTERVAL', '2'))  # 초, 0이면 비활성화
+
+# 섀도 모드 (후보 엔진을 응답 경로 밖에서 비교 평가, SHADOW_ENGINE="모듈:함수")
+SHADOW_ENGINE = os.environ.get('SHADOW_ENGINE', '')
+SHADOW_FRACTION = float(os.environ.get('SHADOW_FRACTION', '0.05'))
+shadow_evaluator = None
+
+# 노드 간 오버라이드 복제 (OVERRIDE_REPLICATION="dir:경로" 또는 "sqlite:경로", 비어 있으면 비활성화)
+OVERRIDE_REPLICATION = os.environ.get('OVERRIDE_REPLICATION', '')
+REPLICATION_NODE_ID = os.environ.get('REPLICATION_NODE_ID') or default_node_id()
+REPLICATION_INTERVAL = float(os.environ.get('REPLICATION_INTERVAL', '2'))
+replicator = None
+
+# 게임 이벤트 저장소 (SQLite, 배치 기록)
+EVENT_STORE_ENABLED = os.environ.get('EVENT_STORE', '1') != '0'
+event_store = None
+
+# 리더보드 (해결한 게임의 토큰/힌트/시간 기록, SQLite)
+LEADERBOARD_ENABLED = os.environ.get('LEADERBOARD', '1') != '0'
+LEADERBOARD_MAX_K = 100
+leaderboard = None
 
-# 학습된 오버라이드 로드
-try:
-    with open(LEARNED_OVERRIDES_FILE, "r", encoding="utf-8") as f:
-        LEARNED_OVERRIDES = json.load(f)
-except FileNotFoundError:
-    LEARNED_OVERRIDES = []
+# 관리자 API (피드백/오버라이드 조회, ADMIN_TOKEN이 비어 있으면 비활성화)
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+ADMIN_PAGE_MAX = 500
+ADMIN_MAX_SCAN = int(os.environ.get('ADMIN_MAX_SCAN', '10000'))  # 페이지 하나에서 훑는 최대 원소 수
 
-# 정답 피드백 로드
-try:
-    with open(ANSWER_FEEDBACK_FILE, "r", encoding="utf-8") as f:
-        ANSWER_FEEDBACK = json.load(f)
-except FileNotFoundError:
-    ANSWER_FEEDBACK = []
+# 질문 최대 길이 (글자 수, 판정 전에 거절하므로 모든 단계의 검사 비용이 이 길이로 제한됨)
+MAX_QUESTION_LENGTH = int(os.environ.get('MAX_QUESTION_LENGTH', '300'))
+# /ask 요청 본문 최대 크기 (글자당 최대 \uXXXX 6바이트 + 여유, 넘으면 JSON 파싱 전에 거절)
+MAX_ASK_BODY_BYTES = MAX_QUESTION_LENGTH * 6 + 1024
+
+# 계층형 판정 (비싼 단계를 프로세스 풀에서 예산 안에 실행, 넘기면 규칙 기반 결과 사용)
+TIERED_EVAL = os.environ.get('TIERED_EVAL', '0') == '1'
+TIERED_BUDGET_MS = float(os.environ.get('TIERED_BUDGET_MS', '50'))
+TIERED_PROCESSES = int(os.environ.get('TIERED_PROCESSES', '2'))
+TIERED_STAGES = ("fuzzy_override", "learned_model")
+tiered_evaluator = None
+
+def record_event(kind: int, **fields):
+    """게임 이벤트 기록 (저장소가 꺼져 있으면 무시)"""
+    if event_store is not None:
+        event_store.record(kind, session=session.get('sid'), **fields)
 
 # Flask 앱 초기화
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret-key')
 
-# 성능 최적화를 위한 캐시 (OrderedDict 사용)
-_question_cache = OrderedDict()
-_cache_max_size = 1000
+# 성능 최적화를 위한 캐시 (실측 바이트 기준 LRU, 값은 공유 플라이웨이트)
+_cache_max_bytes = int(os.environ.get('CACHE_MAX_BYTES', str(1024 * 1024)))
+_question_cache = AnswerCache(_cache_max_bytes)
+
+# 캐시 스냅샷 / 워밍 스타트 설정
+CACHE_WARM_START = os.environ.get('CACHE_WARM_START', '1') != '0'
+CACHE_SNAPSHOT_INTERVAL = float(os.environ.get('CACHE_SNAPSHOT_INTERVAL', '300'))  # 초
+CACHE_SNAPSHOT_SIZE = int(os.environ.get('CACHE_SNAPSHOT_SIZE', '2000'))  # 저장할 최대 항목 수
+_warm_start_info = {"ready": False, "source": None, "entries": 0, "seconds": 0.0}
 _performance_stats = {
     "cache_hits": 0,
     "cache_misses": 0,
@@ -51,12 +166,51 @@ _performance_stats = {
     "cache_evictions": 0
 }
 
+# 캐시 키 정규화(공백 정리) 전후 적중률 비교용: 최근 원문 키(strip().lower()) 기록
+# 적중했지만 원문 키로는 처음 본 질문 = 공백 정리 덕분에 적중한 질문
+# (캐시 키는 정식 표기를 쓰지 않으므로 "…탔나요?"와 "…탔습니까?"는 서로 다른 캐시 항목)
+RAW_KEY_TRACK_SIZE = int(os.environ.get('RAW_KEY_TRACK_SIZE', '20000'))
+_recent_raw_keys = OrderedDict()
+_recent_raw_keys_lock = threading.Lock()
+_normalized_key_stats = {"raw_key_hits": 0, "normalized_only_hits": 0}
+# 정식 표기의 효과: 오버라이드 적중 중 정식 표기가 공백/대소문자 정리 결과와 다른 질문 (정식 표기로 조회해서 적중)
+_override_stats = {"hits": 0, "canonical_key_hits": 0}
+
+def _track_raw_key(raw_key: str) -> bool:
+    """원문 키를 기록하고, 최근에 같은 원문 키를 본 적이 있는지 반환"""
+    with _recent_raw_keys_lock:
+        seen = raw_key in _recent_raw_keys
+        if seen:
+            _recent_raw_keys.move_to_end(raw_key)
+        else:
+            _recent_raw_keys[raw_key] = None
+            if len(_recent_raw_keys) > RAW_KEY_TRACK_SIZE:
+                _recent_raw_keys.popitem(last=False)
+        return seen
+
 # 세션 초기화 함수
 def init_session():
     if 'tokens_left' not in session:
         session['tokens_left'] = 20
     if 'used_hints' not in session:
         session['used_hints'] = []
+    if 'sid' not in session:
+        session['sid'] = uuid.uuid4().hex[:16]
+    # 리더보드 플레이어 id (게임마다 바뀌는 sid와 달리 /reset 후에도 유지, 기존 세션은 sid를 그대로 사용)
+    if 'player' not in session:
+        session['player'] = session['sid']
+    if 'started_at' not in session:
+        session['started_at'] = time.time()
+
+def request_text(field: str):
+    """요청 JSON 본문의 문자열 필드 (앞뒤 공백 제거, 없으면 빈 문자열, 본문이 객체가 아니거나 문자열이 아니면 None)"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return None
+    value = data.get(field)
+    if value is None:
+        return ''
+    return value.strip() if isinstance(value, str) else None
 
 # 사막 시나리오 데이터
 SCENARIO = {
@@ -225,6 +379,21 @@ class DesertConstants:
         "낙하산", "윙슈트", "번지점프", "행글라이딩", "행글라이더"
     ]
 
+    # 신체적 증거 질문 중 시나리오와 무관한 장기/출혈 키워드 (즉시 차단)
+    DANGEROUS_PHYSICAL_KEYWORDS = ["간", "폐", "심장", "신장", "비장", "위", "장", "출혈", "뇌출혈", "내출혈", "뇌 내출혈"]
+
+    # 시나리오와 무관한 신체적 증거 표현
+    IRRELEVANT_PHYSICAL = ["간이", "폐가", "심장이", "신장이", "비장이", "위가", "장이"]
+
+# 매칭용 패턴 튜플 (중복과 더 짧은 패턴을 포함하는 패턴을 뺀 것, any(p in q) 결과는 원래 목록과 같음)
+_CORE_KEYWORDS_MATCH = minimize_patterns(DesertConstants.CORE_KEYWORDS)
+_NONSENSE_MATCH = minimize_patterns(DesertConstants.NONSENSE_PATTERNS)
+_WRONG_ANSWER_MATCH = minimize_patterns(DesertConstants.WRONG_ANSWER_PATTERNS)
+_PHYSICAL_EVIDENCE_MATCH = minimize_patterns(DesertConstants.PHYSICAL_EVIDENCE_QUESTIONS)
+_BANNED_OFF_SCENARIO_MATCH = minimize_patterns(DesertConstants.BANNED_OFF_SCENARIO)
+_DANGEROUS_PHYSICAL_MATCH = minimize_patterns(DesertConstants.DANGEROUS_PHYSICAL_KEYWORDS)
+_IRRELEVANT_PHYSICAL_MATCH = minimize_patterns(DesertConstants.IRRELEVANT_PHYSICAL)
+
 # 유틸리티 함수들
 def normalize_text(text: str) -> str:
     text = text.lower().strip()
@@ -240,6 +409,28 @@ def is_negative_question(question: str) -> bool:
     ]
     return any(pattern in question for pattern in negative_patterns)
 
+def canonical_question(question: str) -> str:
+    """오버라이드 키용 정식 표기 (부정의문 여부가 달라지면 공백/대소문자만 정리)"""
+    canonical = canonicalize(question)
+    if not canonical or is_negative_question(canonical) != is_negative_question(question):
+        return normalize_text(question)
+    return canonical
+
+def question_cache_key(question: str) -> str:
+    """답변 캐시 키 (대소문자/공백만 정리)
+
+    판정 규칙은 물음표, 문장부호, 어미(입니까/인가요), 길이를 구분하므로 정식 표기가 같은 질문도
+    판정이 다를 수 있어 정식 표기는 캐시 키로 쓰지 않음 (판정은 항상 원문으로)
+    """
+    return normalize_text(question)
+
+# 오버라이드 조회 인덱스 (핫 리로드 시 통째로 교체, 정식 표기로 등록/조회)
+if _rule_artifact is not None:
+    _override_index = MappedOverrideIndex(_rule_artifact, key=canonical_question)
+else:
+    _override_index = OverrideIndex(LEARNED_OVERRIDES, 0, OVERRIDE_FUZZY_DISTANCE, OVERRIDE_FUZZY_MIN_LENGTH,
+                                    key=canonical_question)
+
 def convert_negative_question(question: str) -> str:
     """부정의문문을 긍정문으로 변환"""
     if not is_negative_question(question):
@@ -261,6 +452,11 @@ def convert_negative_question(question: str) -> str:
     
     return question
 
+# 추리 관련 질문 패턴 (앞의 임의 글자열은 검색 시작 위치로 대신해 백트래킹 없이 검사)
+_INFERENCE_ENDINGS = ("했나요", "있나요", "인가요", "했어요", "있어요")
+_RELATED_PATTERN = re.compile(r'와\s*관련이\s*있나요')
+_USED_PATTERN = re.compile(r'을\s*사용했나요')
+
 def is_meaningful_question(question: str) -> bool:
     """질문이 추리와 관련된 의미있는 질문인지 판단 (강화된 버전)"""
     q = normalize_text(question)
@@ -295,21 +491,63 @@ def is_meaningful_question(question: str) -> bool:
     is_scenario_related = any(phrase in q for phrase in scenario_phrases)
     
     # 5. 추리 관련 질문 패턴 (강화)
-    import re
-    # "~했나요?", "~있나요?", "~인가요?" 패턴
-    if re.search(r'(.+)(했나요|있나요|인가요|했어요|있어요|인가요)', q):
+    # 앞에 한 글자 이상 있는 "~했나요?", "~있나요?", "~인가요?" 패턴 (두 번째 글자부터 검색)
+    if any(q.find(ending, 1) >= 0 for ending in _INFERENCE_ENDINGS):
         return True
     
-    # "~와 관련이 있나요?" 패턴
-    if re.search(r'(.+)\s*와\s*관련이\s*있나요', q):
-        return True
-    
-    # "~을 사용했나요?" 패턴
-    if re.search(r'(.+)\s*을\s*사용했나요', q):
+    # "~와 관련이 있나요?", "~을 사용했나요?" 패턴
+    if _RELATED_PATTERN.search(q, 1) or _USED_PATTERN.search(q, 1):
         return True
     
     return has_scenario_keyword or (is_question_form and min_length) or is_scenario_related
 
+# 반복 검사용 다항식 해시 (부분 문자열 비교를 O(1)로, 일치는 마지막에 직접 비교해 확정)
+_REPEAT_HASH_MOD = (1 << 61) - 1
+_REPEAT_HASH_BASE = 1_000_003
+
+def has_repeated_chunk(text: str, min_period: int = 2, repeats: int = 3) -> bool:
+    """같은 글자열이 repeats(3 이상)번 이상 연속 반복되는지 (정규식 (.{2,})\\1{2,}와 같은 판정, 백트래킹 없음)
+
+    주기 p로 repeats번 반복되는 구간에는 p의 배수 위치에서 시작하는 같은 블록 두 개(q, q+p)가 들어 있으므로,
+    주기마다 n/p개의 블록 쌍만 해시로 비교하고 (합쳐서 O(n log n)), 같은 쌍은 앞뒤로 주기가 이어지는 길이를
+    이분 탐색으로 구해 반복 횟수를 확인합니다.
+    """
+    n = len(text)
+    if n < min_period * repeats:
+        return False
+    mod, base = _REPEAT_HASH_MOD, _REPEAT_HASH_BASE
+    prefix = [0] * (n + 1)
+    power = [1] * (n + 1)
+    for i, ch in enumerate(text):
+        prefix[i + 1] = (prefix[i] * base + ord(ch)) % mod
+        power[i + 1] = power[i] * base % mod
+
+    def same(i: int, j: int, length: int) -> bool:
+        return (prefix[i + length] - prefix[i] * power[length] - prefix[j + length] + prefix[j] * power[length]) % mod == 0
+
+    def extend(fits, limit: int) -> int:
+        """fits(k)가 참인 가장 큰 k (0 <= k <= limit, fits는 단조)"""
+        low, high = 0, limit
+        while low < high:
+            mid = (low + high + 1) // 2
+            if fits(mid):
+                low = mid
+            else:
+                high = mid - 1
+        return low
+
+    for period in range(min_period, n // repeats + 1):
+        need = period * (repeats - 1)    # text[i] == text[i + period]가 연속해야 하는 길이
+        for q in range(0, n - 2 * period + 1, period):
+            if not same(q, q + period, period):
+                continue
+            forward = extend(lambda k: same(q, q + period, k), min(need, n - q - period))
+            back = extend(lambda k: same(q - k, q + period - k, k), min(need, q))
+            start = q - back
+            if back + forward >= need and text[start:start + need] == text[start + period:start + period + need]:
+                return True
+    return False
+
 def is_nonsense_pattern(question: str) -> bool:
     """무의미한 패턴 감지 (규칙 기반)"""
     q = question.strip().lower()
@@ -334,10 +572,8 @@ def is_nonsense_pattern(question: str) -> bool:
     ]):
         return True
     
-    # 5. 반복되는 무의미한 단어 (패턴 기반)
-    import re
-    # 같은 단어가 3번 이상 반복되는 패턴
-    if re.search(r'(.{2,})\1{2,}', q):  # 2글자 이상 단어가 3번 이상 반복
+    # 5. 반복되는 무의미한 단어 - 2글자 이상 단어가 3번 이상 연속 반복 (줄 단위)
+    if any(has_repeated_chunk(line) for line in q.split("\n")):
         return True
     
     # 6. 의미없는 조합 패턴 (규칙 기반)
@@ -374,10 +610,16 @@ def load_learned_overrides():
     except FileNotFoundError:
         return []
 
+def _write_json_atomic(path: Path, data):
+    """임시 파일에 쓴 뒤 교체 (다른 프로세스가 반쯤 쓰인 파일을 읽지 않도록)"""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
 def save_learned_overrides(overrides):
     """학습된 오버라이드 저장"""
-    with open(LEARNED_OVERRIDES_FILE, "w", encoding="utf-8") as f:
-        json.dump(overrides, f, ensure_ascii=False, indent=2)
+    _write_json_atomic(LEARNED_OVERRIDES_FILE, overrides)
 
 def load_answer_feedback():
     """정답 피드백 로드"""
@@ -387,10 +629,123 @@ def load_answer_feedback():
     except FileNotFoundError:
         return []
 
-def save_answer_feedback(feedback):
-    """정답 피드백 저장"""
-    with open(ANSWER_FEEDBACK_FILE, "w", encoding="utf-8") as f:
-        json.dump(feedback, f, ensure_ascii=False, indent=2)
+def append_answer_feedback(item):
+    """정답 피드백 하나를 파일 끝에 추가 (다른 워커와 동시에 추가해도 덮어쓰지 않도록 파일 잠금)"""
+    with _answer_feedback_lock:
+        append_item(ANSWER_FEEDBACK_FILE, item)
+
+def _install_override_index(new_index, changed) -> int:
+    """새(또는 제자리에서 갱신한) 인덱스를 설치하고 바뀐 질문(및 유사 일치 질문)의 캐시 항목 무효화 (_reload_lock 안에서 호출)"""
+    global _override_index, LEARNED_OVERRIDES, _rules_generation
+    # 새 인덱스는 요청 경로 밖에서 완성한 뒤 참조 하나만 바꿔치기 (RCU 방식)
+    _rules_generation += 1
+    _override_index = new_index
+    LEARNED_OVERRIDES = getattr(new_index, "overrides", None)
+    
+    # 정식 표기가 바뀐 오버라이드 질문과 같거나 유사 일치할 수 있는 캐시 항목 무효화 (변경 시에만 한 번 훑음)
+    invalidated = set()
+    if changed:
+        for key, _ in _question_cache.items():
+            if canonical_question(key) in changed or new_index.fuzzy_matches(key, changed):
+                invalidated.add(key)
+    for key in invalidated:
+        _question_cache.pop(key)
+    return len(invalidated)
+
+def _rebuild_override_index(overrides) -> int:
+    """오버라이드 목록으로 새 인덱스를 만들어 교체 (_reload_lock 안에서 호출)"""
+    old_index = _override_index
+    new_index = OverrideIndex(overrides, old_index.generation + 1,
+                              OVERRIDE_FUZZY_DISTANCE, OVERRIDE_FUZZY_MIN_LENGTH, key=canonical_question)
+    return _install_override_index(new_index, old_index.changed_questions(new_index))
+
+def _load_current_artifact():
+    """현재 오버라이드 파일과 일치하는 아티팩트 (_overrides_file_lock 안에서 호출, 없으면 None)"""
+    return load_rule_artifact(RULE_ARTIFACT_FILE, LEARNED_OVERRIDES_FILE,
+                              OVERRIDE_FUZZY_DISTANCE, OVERRIDE_FUZZY_MIN_LENGTH)
+
+def rebuild_rule_artifact(overrides):
+    """방금 쓴 오버라이드 파일로 아티팩트를 다시 빌드해 열기 (_overrides_file_lock 안에서 호출)"""
+    build_artifact(overrides, rule_constants(DesertConstants), RULE_ARTIFACT_FILE,
+                   OVERRIDE_FUZZY_DISTANCE, OVERRIDE_FUZZY_MIN_LENGTH,
+                   _overrides_file_signature(), canonical_question)
+    return _load_current_artifact()
+
+def apply_override_changes(new_overrides, on_written=None) -> int:
+    """추가된 오버라이드들을 파일에 덧붙이고 인덱스에 반영 (이미 반영된 복제 버전은 건너뜀)
+
+    on_written은 파일 쓰기가 끝난 뒤 같은 잠금 안에서 호출 (복제 위치 저장용)
+    """
+    global _overrides_signature
+    with _reload_lock, _overrides_file_lock:
+        # 다른 워커가 추가한 오버라이드를 덮어쓰지 않도록 잠금 안에서 디스크 내용에 추가
+        signature = _overrides_file_signature()
+        overrides = load_learned_overrides()
+        stored_versions = {override.get("version") for override in overrides if override.get("version")}
+        fresh = [override for override in new_overrides
+                 if not override.get("version") or override["version"] not in stored_versions]
+        if fresh:
+            overrides.extend(fresh)
+            save_learned_overrides(overrides)
+        
+        index = _override_index
+        up_to_date = signature == _overrides_signature
+        artifact = rebuild_rule_artifact(overrides) if fresh and RULE_ARTIFACT_ENABLED else None
+        if artifact is not None:
+            # 새 아티팩트로 교체 (다른 워커도 파일 감시로 같은 아티팩트를 염, 이전 mmap은 참조가 없어지면 닫힘)
+            new_index = MappedOverrideIndex(artifact, index.generation + 1, key=canonical_question)
+            if up_to_date:
+                keys = {canonical_question(o["question"]) for o in new_overrides if o.get("question")}
+                changed = {key for key in keys if index.lookup(key) != new_index.lookup(key)}
+            else:
+                changed = index.changed_questions(new_index)
+            invalidated = _install_override_index(new_index, changed)
+        elif up_to_date and not fresh:
+            # 모두 이미 파일과 인덱스에 반영된 복제 항목
+            invalidated = 0
+        elif isinstance(index, OverrideIndex) and up_to_date:
+            # 인덱스가 디스크 내용과 같으면 추가분만 제자리 반영 (복사/재구성 없음)
+            changed = index.extend(fresh)
+            invalidated = _install_override_index(index, changed) if changed else 0
+        else:
+            # 다른 프로세스가 먼저 쓴 변경이 아직 반영되지 않았거나 아티팩트(mmap) 인덱스면 디스크 내용으로 재구성
+            invalidated = _rebuild_override_index(overrides)
+        # 직접 쓴 파일은 파일 감시에서 다시 읽지 않음
+        _overrides_signature = _overrides_file_signature()
+        if on_written is not None:
+            on_written()
+        return invalidated
+
+def reload_learned_overrides(path=None):
+    """디스크의 오버라이드 파일이 다른 프로세스나 운영자에 의해 바뀌었으면 다시 읽어 인덱스 교체"""
+    global _overrides_signature
+    # 다른 워커가 파일과 아티팩트를 다 쓴 뒤에 읽도록 같은 잠금 안에서
+    with _reload_lock, _overrides_file_lock:
+        signature = _overrides_file_signature()
+        if signature == _overrides_signature:
+            return
+        artifact = _load_current_artifact() if RULE_ARTIFACT_ENABLED else None
+        if artifact is not None:
+            old_index = _override_index
+            new_index = MappedOverrideIndex(artifact, old_index.generation + 1, key=canonical_question)
+            invalidated = _install_override_index(new_index, old_index.changed_questions(new_index))
+            count = len(new_index)
+        else:
+            overrides = load_learned_overrides()
+            invalidated = _rebuild_override_index(overrides)
+            count = len(overrides)
+        _overrides_signature = signature
+    logger.info(f"Reloaded {count} learned overrides ({invalidated} cache entries invalidated)")
+
+def reload_fallback_model(path=None):
+    """학습 모델 아티팩트가 바뀌면 다시 로드 (판정 전체가 바뀔 수 있으므로 캐시 비움)"""
+    global FALLBACK_MODEL, _rules_generation
+    model = load_fallback_model(FALLBACK_MODEL_FILE)
+    with _reload_lock:
+        _rules_generation += 1
+        FALLBACK_MODEL = model
+        _question_cache.clear()
+    logger.info(f"Reloaded fallback model ({'enabled' if FALLBACK_MODEL else 'disabled'})")
 
 # 질문 분류기 클래스
 class QuestionClassifier:
@@ -398,45 +753,66 @@ class QuestionClassifier:
     def is_relevant_question(question: str) -> bool:
         """질문이 시나리오와 관련이 있는지 확인"""
         q = normalize_text(question)
-        return any(keyword in q for keyword in DesertConstants.CORE_KEYWORDS)
+        return any(keyword in q for keyword in _CORE_KEYWORDS_MATCH)
     
     @staticmethod
     def is_nonsense_question(question: str) -> bool:
         """무의미한 질문인지 확인"""
         q = normalize_text(question)
-        return any(pattern in q for pattern in DesertConstants.NONSENSE_PATTERNS)
+        return any(pattern in q for pattern in _NONSENSE_MATCH)
     
     @staticmethod
     def is_wrong_answer_question(question: str) -> bool:
         """오답 질문인지 확인"""
         q = normalize_text(question)
-        return any(pattern in q for pattern in DesertConstants.WRONG_ANSWER_PATTERNS)
+        return any(pattern in q for pattern in _WRONG_ANSWER_MATCH)
     
     @staticmethod
     def is_off_scenario_question(question: str) -> bool:
         """시나리오와 관련 없는 질문인지 확인"""
         q = normalize_text(question)
-        return any(banned in q for banned in DesertConstants.BANNED_OFF_SCENARIO)
+        return any(banned in q for banned in _BANNED_OFF_SCENARIO_MATCH)
     
     @staticmethod
     def is_physical_evidence_question(question: str) -> bool:
         """신체적 증거 관련 질문인지 확인"""
         q = normalize_text(question)
-        return any(pattern in q for pattern in DesertConstants.PHYSICAL_EVIDENCE_QUESTIONS)
+        return any(pattern in q for pattern in _PHYSICAL_EVIDENCE_MATCH)
 
 # 질문 판단기 클래스
 class QuestionJudge:
     @staticmethod
     def check_learned_overrides(question: str) -> dict:
-        """학습된 오버라이드 확인"""
-        for override in LEARNED_OVERRIDES:
-            if override["question"] == question:
-                return {
-                    "verdict": override["correct_classification"],
-                    "evidence": "학습된 오버라이드",
-                    "nl": override["correct_answer"]
-                }
-        return None
+        """학습된 오버라이드 확인 (O(1) 인덱스 조회)"""
+        result = _override_index.lookup(question)
+        if result is not None:
+            _override_stats["hits"] += 1
+            if canonical_question(question) != normalize_text(question):
+                _override_stats["canonical_key_hits"] += 1
+        return result
+    
+    @staticmethod
+    def check_fuzzy_overrides(question: str) -> dict:
+        """오타/띄어쓰기만 다른 학습된 오버라이드 확인 (삭제 사전 기반, 전체 스캔 없음)"""
+        # 한 글자 차이로 부정/긍정이 바뀌는 경우(아닌/인)는 매칭하지 않음
+        negative = is_negative_question(question)
+        return _override_index.lookup_fuzzy(
+            question, lambda override_question: is_negative_question(override_question) == negative
+        )
+    
+    @staticmethod
+    def check_learned_model(question: str) -> dict:
+        """학습된 폴백 분류기 확인 (규칙으로 결정되지 않은 질문)"""
+        if FALLBACK_MODEL is None:
+            return None
+        label, confidence = FALLBACK_MODEL.predict(question)
+        if confidence < FALLBACK_MIN_CONFIDENCE:
+            return None
+        return {
+            "verdict": label,
+            "evidence": "학습 모델",
+            "nl": "예" if label == "yes" else "아니오"
+        }
     
     @staticmethod
     def check_nonsense_question(question: str) -> dict:
@@ -545,7 +921,7 @@ def handle_detailed_question(question: str) -> bool:
     """상세 질문 (어떻게, 왜, 무엇 등) 감지"""
     detailed_keywords = ["왜", "어떻게", "무엇", "누구", "언제", "어디서", "어떤", "몇", "얼마나"]
     result = any(keyword in question for keyword in detailed_keywords)
-    print(f"DEBUG: handle_detailed_question('{question}') = {result}")
+    logger.debug("handle_detailed_question(%r) = %s", question, result)
     return result
 
 def is_scenario_external_question(question: str) -> bool:
@@ -635,6 +1011,10 @@ def analyze_question_semantics(question: str) -> dict:
 
 def judge_question_cached(question: str) -> dict:
     """캐시를 사용한 질문 판단 (최적화된 LRU + 에러 처리)"""
+    return judge_question_with_cache_status(question)[0]
+
+def judge_question_with_cache_status(question: str) -> tuple:
+    """캐시를 사용한 질문 판단 - (결과, 캐시 적중 여부) 반환"""
     global _question_cache, _performance_stats
     
     try:
@@ -642,42 +1022,48 @@ def judge_question_cached(question: str) -> dict:
         
         # 입력 검증
         if not question or not isinstance(question, str):
-            return {"verdict": "no", "evidence": "입력 오류", "nl": "올바른 질문을 입력해주세요."}
+            return {"verdict": "no", "evidence": "입력 오류", "nl": "올바른 질문을 입력해주세요."}, False
+        if len(question) > MAX_QUESTION_LENGTH:
+            return {"verdict": "no", "evidence": "입력 오류", "nl": f"질문은 {MAX_QUESTION_LENGTH}자 이내로 입력해주세요."}, False
         
-        # 캐시 확인 (OrderedDict로 O(1) 접근)
-        cache_key = question.strip().lower()
-        if cache_key in _question_cache:
+        # 캐시 확인 (O(1) 접근, 적중 시 LRU 순서 갱신)
+        cache_key = question_cache_key(question)
+        raw_seen = _track_raw_key(question.strip().lower())
+        cached = _question_cache.get(cache_key)
+        if cached is not None:
             _performance_stats["cache_hits"] += 1
-            # LRU: 접근한 항목을 맨 뒤로 이동 (O(1) 연산)
-            _question_cache.move_to_end(cache_key)
-            return _question_cache[cache_key]
+            _normalized_key_stats["raw_key_hits" if raw_seen else "normalized_only_hits"] += 1
+            return cached, True
         
-        # 캐시에 없으면 계산
+        # 캐시에 없으면 원문으로 계산
         _performance_stats["cache_misses"] += 1
-        result = judge_question(question)
+        generation = _rules_generation
+        if tiered_evaluator is not None:
+            result = tiered_evaluator.run(question)[0]
+        else:
+            result = judge_question(question)
         
         # 결과 검증
         if not result or not isinstance(result, dict):
-            return {"verdict": "no", "evidence": "처리 오류", "nl": "죄송합니다. 다시 시도해주세요."}
+            return {"verdict": "no", "evidence": "처리 오류", "nl": "죄송합니다. 다시 시도해주세요."}, False
         
-        # 캐시 크기 관리 (최적화된 버전)
-        if len(_question_cache) >= _cache_max_size:
-            # 가장 오래된 항목 삭제 (O(1) 연산)
-            _question_cache.popitem(last=False)
-            _performance_stats["cache_evictions"] += 1
+        # 공유 플라이웨이트로 인터닝 후 캐시 저장 (바이트 한도 초과 시 오래된 항목부터 삭제)
+        result = intern_verdict(result)
+        # 계산 도중 오버라이드/모델이 교체되었다면 오래된 결과이므로 캐시하지 않음
+        # 예산 초과로 규칙 결과를 대신 쓴 경우도 다음 요청에서 다시 판정하도록 캐시하지 않음
+        if generation == _rules_generation and "fallback" not in result:
+            _performance_stats["cache_evictions"] += _question_cache.put(cache_key, result)
         
-        # 캐시 저장
-        _question_cache[cache_key] = result
-        
-        return result
+        return result, False
         
     except Exception as e:
         # 에러 로깅
         logger.error(f"Error in judge_question_cached: {e}")
-        return {"verdict": "no", "evidence": "시스템 오류", "nl": "죄송합니다. 다시 시도해주세요."}
+        return {"verdict": "no", "evidence": "시스템 오류", "nl": "죄송합니다. 다시 시도해주세요."}, False
 
 def get_memory_usage():
-    """메모리 사용량 모니터링"""
+    """메모리 사용량 모니터링 (캐시는 실측 바이트 기준)"""
+    cache_memory = _question_cache.memory_stats()
     try:
         import psutil
         process = psutil.Process()
@@ -686,15 +1072,13 @@ def get_memory_usage():
         return {
             "rss": memory_info.rss / 1024 / 1024,  # MB
             "vms": memory_info.vms / 1024 / 1024,  # MB
-            "cache_size": len(_question_cache),
-            "cache_memory_estimate": len(_question_cache) * 0.5  # KB per entry estimate
+            **cache_memory
         }
     except ImportError:
         return {
             "rss": 0,
             "vms": 0,
-            "cache_size": len(_question_cache),
-            "cache_memory_estimate": len(_question_cache) * 0.5
+            **cache_memory
         }
 
 def get_performance_stats() -> dict:
@@ -704,14 +1088,105 @@ def get_performance_stats() -> dict:
     if total > 0:
         hit_rate = _performance_stats["cache_hits"] / total * 100
         memory_info = get_memory_usage()
+        raw_hit_rate = _normalized_key_stats["raw_key_hits"] / total * 100
+        override_hits = _override_stats["hits"]
         return {
             **_performance_stats,
             "cache_hit_rate": f"{hit_rate:.1f}%",
+            # 원문 키였다면 적중했을 비율 vs 공백/대소문자를 정리한 캐시 키로 실제 적중한 비율
+            "cache_keys": {
+                **_normalized_key_stats,
+                "raw_hit_rate": f"{raw_hit_rate:.1f}%",
+                "normalized_hit_rate": f"{hit_rate:.1f}%",
+            },
+            "canonical_overrides": {
+                **_override_stats,
+                "canonical_key_hit_rate": f"{_override_stats['canonical_key_hits'] / override_hits * 100:.1f}%"
+                                          if override_hits else None,
+            },
             "cache_size": len(_question_cache),
-            "memory_efficiency": f"{len(_question_cache)}/{_cache_max_size}",
-            "memory_usage": memory_info
+            "memory_efficiency": f"{_question_cache.bytes_used}/{_cache_max_bytes} bytes",
+            "memory_usage": memory_info,
+            "warm_start": _warm_start_info,
+            "request_log": request_log.stats(),
+            "shadow": shadow_evaluator.stats() if shadow_evaluator else None,
+            "event_store": event_store.stats() if event_store else None,
+            "replication": replicator.stats() if replicator else None,
+            "stages": judge_pipeline.stats(),
+            "tiered": tiered_evaluator.stats() if tiered_evaluator else None
         }
-    return _performance_stats
+    return {
+        **_performance_stats,
+        "warm_start": _warm_start_info,
+        "request_log": request_log.stats(),
+        "shadow": shadow_evaluator.stats() if shadow_evaluator else None,
+        "event_store": event_store.stats() if event_store else None,
+        "replication": replicator.stats() if replicator else None,
+        "stages": judge_pipeline.stats(),
+        "tiered": tiered_evaluator.stats() if tiered_evaluator else None
+    }
+
+# 판정 결과에 영향을 주는 모듈 (app.py 외)
+RULE_SOURCE_FILES = (
+    "answer_cache.py", "canonical.py", "fallback_model.py", "fuzzy_index.py", "override_index.py",
+    "pattern_lint.py", "rule_artifact.py", "stages.py", "tiered.py",
+)
+
+def rules_version() -> str:
+    """판정 결과에 영향을 주는 파일/설정의 지문 (스냅샷 유효성 확인용)"""
+    # 오버라이드 파일은 클 수 있으므로 내용 대신 크기/수정 시각으로 반영
+    return compute_version(
+        [Path(__file__), *(BASE_DIR / name for name in RULE_SOURCE_FILES), FALLBACK_MODEL_FILE],
+        signature_paths=[LEARNED_OVERRIDES_FILE],
+        settings={
+            "OVERRIDE_FUZZY_DISTANCE": OVERRIDE_FUZZY_DISTANCE,
+            "OVERRIDE_FUZZY_MIN_LENGTH": OVERRIDE_FUZZY_MIN_LENGTH,
+            "FALLBACK_MIN_CONFIDENCE": FALLBACK_MIN_CONFIDENCE,
+            "MAX_QUESTION_LENGTH": MAX_QUESTION_LENGTH,
+            "TIERED_EVAL": TIERED_EVAL,
+            "TIERED_STAGES": TIERED_STAGES,
+            "TIERED_BUDGET_MS": TIERED_BUDGET_MS,
+        },
+    )
+
+def snapshot_question_cache() -> int:
+    """가장 많이 적중한 캐시 항목을 디스크에 저장"""
+    entries = _question_cache.hottest(CACHE_SNAPSHOT_SIZE)
+    if not entries:
+        return 0
+    return save_snapshot(CACHE_SNAPSHOT_FILE, rules_version(), entries)
+
+def warm_start_cache() -> dict:
+    """스냅샷(없으면 오버라이드 질문 원문)으로 캐시를 미리 채움"""
+    started = time.perf_counter()
+    entries = load_snapshot(CACHE_SNAPSHOT_FILE, rules_version())
+    if entries is not None:
+        source = "snapshot"
+        for key, result in entries:
+            _question_cache.put(key, intern_verdict(result))
+    else:
+        source = "overrides"
+        # 인덱스 키는 정식 표기라 사용자가 보내지 않는 문장일 수 있으므로 파일의 원문 질문으로
+        # (오버라이드가 아주 많아도 프라이밍 시간이 일정하도록 파일을 원소 단위로 읽어 스냅샷 크기만큼만)
+        primed = {}
+        for override, _ in iter_array(LEARNED_OVERRIDES_FILE):
+            if len(primed) >= CACHE_SNAPSHOT_SIZE:
+                break
+            question = override.get("question") if isinstance(override, dict) else None
+            if isinstance(question, str) and question.strip():
+                primed.setdefault(question_cache_key(question), question)
+        entries = list(primed.values())
+        for question in entries:
+            _question_cache.put(question_cache_key(question), intern_verdict(judge_question(question)))
+    
+    _warm_start_info.update({
+        "ready": True,
+        "source": source,
+        "entries": len(entries),
+        "seconds": round(time.perf_counter() - started, 3)
+    })
+    logger.info(f"Cache primed from {source}: {len(entries)} entries")
+    return _warm_start_info
 
 def quick_filter_checks(question: str) -> dict:
     """빠른 필터링 검사들"""
@@ -739,96 +1214,119 @@ def detailed_question_analysis(question: str) -> dict:
     
     return None
 
-def judge_question(question: str) -> dict:
-    """질문을 판단하여 답변을 생성 (체계적 분류 시스템)"""
-    
-    # 🔍 1단계: 기본 필터링 (가장 빠른 검사들)
-    # 1-1. 무의미한 패턴 감지 (최우선)
+def check_nonsense_stage(question: str) -> dict:
+    """1-1. 무의미한 패턴 감지"""
     if is_nonsense_pattern(question):
         return {"verdict": "no", "evidence": "무의미한 질문", "nl": "추리와 연관있는 질문이 아닙니다."}
-    
-    # 1-2. 시나리오 외부 질문 감지
+    return None
+
+def check_external_stage(question: str) -> dict:
+    """1-2. 시나리오 외부 질문 감지"""
     if is_scenario_external_question(question):
         return {"verdict": "no", "evidence": "시나리오 외 정보", "nl": "이 정보는 시나리오에 포함되어 있지 않습니다. 사건과 관련된 질문을 해보세요."}
-    
-    # 1-3. 의미있는 질문인지 빠른 검사
+    return None
+
+def check_meaningless_stage(question: str) -> dict:
+    """1-3. 의미있는 질문인지 빠른 검사"""
     if not is_meaningful_question(question):
         return {"verdict": "no", "evidence": "관련없는 질문", "nl": "이 사건과 관련된 질문을 해주세요."}
+    return None
+
+def check_physical_evidence_stage(question: str) -> dict:
+    """4단계: 신체적 증거 관련 질문 확인 (완전 안전한 필터링)"""
+    if not QuestionClassifier.is_physical_evidence_question(question):
+        return None
+    q = normalize_text(question)
     
-    # 🔍 2단계: 학습된 규칙 적용 (우선순위 높음)
-    # 2-1. 학습된 오버라이드 확인
-    override_result = QuestionJudge.check_learned_overrides(question)
-    if override_result:
-        return override_result
-    
-    # 2-2. 오답 질문 확인
-    wrong_answer_result = QuestionJudge.check_wrong_answer_question(question)
-    if wrong_answer_result:
-        return wrong_answer_result
+    # 🚨 위험한 키워드 즉시 차단 (최우선)
+    if any(keyword in q for keyword in _DANGEROUS_PHYSICAL_MATCH):
+        return {"verdict": "no", "evidence": "시나리오 무관", "nl": "이 정보는 시나리오에 포함되어 있지 않습니다. 사건과 관련된 질문을 해보세요."}
     
-    # 🔍 3단계: 특정 규칙들 확인 (시나리오 기반)
-    # 3-1. 성냥 관련 특별 규칙
-    specific_rules_result = QuestionJudge.check_specific_rules(question)
-    if specific_rules_result:
-        return specific_rules_result
+    # 🚨 시나리오와 무관한 신체적 증거 차단
+    if any(keyword in q for keyword in _IRRELEVANT_PHYSICAL_MATCH):
+        return {"verdict": "no", "evidence": "시나리오 무관", "nl": "이 정보는 시나리오에 포함되어 있지 않습니다. 사건과 관련된 질문을 해보세요."}
     
-    # 🚰 4단계: 신체적 증거 관련 질문 확인 (완전 안전한 필터링)
-    if QuestionClassifier.is_physical_evidence_question(question):
-        q = normalize_text(question)
-        
-        # 🚨 위험한 키워드 즉시 차단 (최우선)
-        dangerous_keywords = ["간", "폐", "심장", "신장", "비장", "위", "장", "출혈", "뇌출혈", "내출혈", "뇌 내출혈"]
-        if any(keyword in q for keyword in dangerous_keywords):
-            return {"verdict": "no", "evidence": "시나리오 무관", "nl": "이 정보는 시나리오에 포함되어 있지 않습니다. 사건과 관련된 질문을 해보세요."}
-        
-        # 🚨 시나리오와 무관한 신체적 증거 차단
-        irrelevant_physical = ["간이", "폐가", "심장이", "신장이", "비장이", "위가", "장이"]
-        if any(keyword in q for keyword in irrelevant_physical):
-            return {"verdict": "no", "evidence": "시나리오 무관", "nl": "이 정보는 시나리오에 포함되어 있지 않습니다. 사건과 관련된 질문을 해보세요."}
-        
-        # ✅ 안전한 신체적 증거만 처리 (떨어져서 생긴 상처/부상)
-        if any(word in q for word in ["상처가 없", "깨끗", "정상", "다치지 않", "부상이 없", "손상이 없", "건강", "무사"]):
-            return {"verdict": "no", "evidence": "신체적 증거", "nl": "아니오"}
+    # ✅ 안전한 신체적 증거만 처리 (떨어져서 생긴 상처/부상)
+    if any(word in q for word in ["상처가 없", "깨끗", "정상", "다치지 않", "부상이 없", "손상이 없", "건강", "무사"]):
+        return {"verdict": "no", "evidence": "신체적 증거", "nl": "아니오"}
+    else:
+        # 시나리오와 관련된 상처/부상만 "예" 처리
+        if any(word in q for word in ["상처", "다쳤", "부상", "손상", "멍", "부어", "변형", "절단"]):
+            return {"verdict": "yes", "evidence": "신체적 증거", "nl": "예"}
         else:
-            # 시나리오와 관련된 상처/부상만 "예" 처리
-            if any(word in q for word in ["상처", "다쳤", "부상", "손상", "멍", "부어", "변형", "절단"]):
-                return {"verdict": "yes", "evidence": "신체적 증거", "nl": "예"}
-            else:
-                return {"verdict": "no", "evidence": "시나리오 무관", "nl": "이 정보는 시나리오에 포함되어 있지 않습니다. 사건과 관련된 질문을 해보세요."}
-    
-    # 🔍 5단계: 상세 질문 유형 분류 (최종 분류)
-    question_type = classify_question_type(question)
-    
-    # 5-1. 상세 질문 처리 (어떻게, 왜, 무엇 등)
+            return {"verdict": "no", "evidence": "시나리오 무관", "nl": "이 정보는 시나리오에 포함되어 있지 않습니다. 사건과 관련된 질문을 해보세요."}
+
+def check_detailed_stage(question: str) -> dict:
+    """5-1. 상세 질문 처리 (어떻게, 왜, 무엇 등)"""
     if handle_detailed_question(question):
         return {"verdict": "no", "evidence": "상세 질문", "nl": "예/아니오로 답변할 수 있는 질문만 해달라"}
+    return None
+
+def judge_remaining_question(question: str) -> dict:
+    """5단계: 앞 단계에서 결정되지 않은 질문의 상세 유형 분류 (최종 분류, 항상 결정)"""
+    # 유형 분류는 5-1(상세 질문), 5-2(학습 모델) 단계에서 결정되지 않았을 때만 계산 (부작용 없음)
+    question_type = classify_question_type(question)
     
-    # 5-2. 시나리오 기반 질문
+    # 5-3. 시나리오 기반 질문
     if question_type == "scenario_based":
         return {"verdict": "yes", "evidence": "시나리오 기반", "nl": "예"}
     
-    # 5-3. 기타 유형들
+    # 5-4. 기타 유형들
     if question_type == "wrong_answer":
         return {"verdict": "no", "evidence": "오답 질문", "nl": "아니오"}
     elif question_type == "off_scenario":
         return {"verdict": "no", "evidence": "시나리오 무관", "nl": "아니오"}
     else:
         return {"verdict": "no", "evidence": "애매한 질문", "nl": "아니오"}
-    
-    # 🔍 6단계: 부정의문문 처리 (최종 단계)
-    # result 변수가 정의되지 않았으므로 기본값 설정
-    result = {"verdict": "no", "evidence": "애매한 질문", "nl": "아니오"}
-    
-    is_negative = is_negative_question(question)
-    if is_negative:
-        if result["verdict"] == "yes":
-            result["verdict"] = "no"
-            result["nl"] = "아니오"
-        elif result["verdict"] == "no":
-            result["verdict"] = "yes"
-            result["nl"] = "예"
-    
-    return result
+
+# 판정 단계 (선언 순서대로 실행)
+# 규칙들이 키워드가 겹치는 질문에서 서로 다른 판정/근거를 내므로 순서가 결과를 바꿈
+# (단계 추가/이동 시 `python stages.py check`로 순서에 의존하는 단계 쌍 확인)
+JUDGE_STAGES = [
+    # 🔍 1단계: 기본 필터링 - 서로 다른 근거로 거절하므로 순서 유지
+    Stage("nonsense", check_nonsense_stage),
+    Stage("external", check_external_stage),
+    Stage("meaningless", check_meaningless_stage),
+    # 🔍 2단계: 학습된 규칙 - 기본 필터 이후, 정확 일치가 유사 일치보다 우선
+    Stage("override", QuestionJudge.check_learned_overrides),
+    Stage("fuzzy_override", QuestionJudge.check_fuzzy_overrides, enabled=lambda: _override_index.fuzzy_distance > 0),
+    # 🔍 3~4단계: 규칙 - 학습된 오버라이드(사람이 고친 판정)가 항상 우선
+    Stage("wrong_answer", QuestionJudge.check_wrong_answer_question),
+    Stage("specific_rules", QuestionJudge.check_specific_rules),
+    Stage("physical_evidence", check_physical_evidence_stage),
+    # 🔍 5단계: 남은 질문 - 상세 질문 거절 후 학습된 폴백 분류기, 그래도 결정되지 않으면 유형 분류(terminal)
+    Stage("detailed", check_detailed_stage),
+    Stage("learned_model", QuestionJudge.check_learned_model, enabled=lambda: FALLBACK_MODEL is not None),
+]
+
+STAGE_TIMING_SAMPLE = int(os.environ.get('STAGE_TIMING_SAMPLE', '100'))
+judge_pipeline = StagePipeline(JUDGE_STAGES, judge_remaining_question, sample_every=STAGE_TIMING_SAMPLE)
+
+def judge_question(question: str) -> dict:
+    """질문을 판단하여 답변을 생성 (체계적 분류 시스템, 단계는 judge_pipeline 참고)"""
+    return judge_pipeline.run(question)[0]
+
+# 요청 로그 (경로, 상태, 지연 시간 + 라우트별 필드)
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def log_request(response):
+    if REQUEST_LOG_ENABLED:
+        started = g.get('request_started')
+        latency_ms = (time.perf_counter() - started) * 1000 if started else None
+        request_log.event(
+            "request",
+            # 오류 응답은 항상 기록하고, 고빈도 경로의 정상 응답만 표본 추출
+            sampled=request.path in HIGH_VOLUME_ROUTES and response.status_code < 400,
+            route=request.path,
+            method=request.method,
+            status=response.status_code,
+            latency_ms=round(latency_ms, 3) if latency_ms is not None else None,
+            **g.get('log_fields', {})
+        )
+    return response
 
 # Flask 라우트들
 @app.route('/')
@@ -838,13 +1336,28 @@ def index():
 @app.route('/ask', methods=['POST'])
 def ask():
     init_session()
-    question = request.json.get('question', '').strip()
+    if request.content_length is not None and request.content_length > MAX_ASK_BODY_BYTES:
+        return jsonify({'error': f'질문은 {MAX_QUESTION_LENGTH}자 이내로 입력해주세요.'}), 413
+    question = request_text('question')
     if not question:
-        logger.warning("Empty question received")
+        logger.warning("Empty or invalid question received")
         return jsonify({'error': '질문을 입력해주세요.'}), 400
-    
-    logger.info(f"Processing question: {question[:50]}...")
-    result = judge_question_cached(question)
+    if len(question) > MAX_QUESTION_LENGTH:
+        return jsonify({'error': f'질문은 {MAX_QUESTION_LENGTH}자 이내로 입력해주세요.'}), 400
+    
+    started = time.perf_counter()
+    result, cache_hit = judge_question_with_cache_status(question)
+    if shadow_evaluator is not None:
+        shadow_evaluator.maybe_submit(question, result, (time.perf_counter() - started) * 1000)
+    record_event(KIND_ASK, question=question, verdict=result['verdict'], evidence=result.get('evidence'))
+    # 요청 로그 필드 (after_request에서 기록)
+    g.log_fields = {
+        'question': question[:50],
+        'evidence': result.get('evidence', ''),
+        'verdict': result['verdict'],
+        'cache_hit': cache_hit,
+        'fallback': result.get('fallback')
+    }
     
     # JavaScript가 기대하는 형식으로 변환
     if result['verdict'] == 'yes':
@@ -885,6 +1398,7 @@ def hint():
     hint_text = hints[len(used_hints)]
     used_hints.append(hint_text)
     session['used_hints'] = used_hints
+    record_event(KIND_HINT, hint_index=len(used_hints))
     
     # 힌트는 토큰(질문 횟수)을 소모하지 않음
     # 힌트 횟수만 차감됨
@@ -898,9 +1412,12 @@ def hint():
 @app.route('/guess', methods=['POST'])
 def guess():
     init_session()
-    guess_text = request.json.get('guess', '').strip()
+    guess_text = request_text('guess')
     if not guess_text:
         return jsonify({'error': '정답을 입력해주세요.'}), 400
+    name = request_text('name')
+    if name is None:
+        return jsonify({'error': '이름은 문자열로 입력해주세요.'}), 400
     
     # 핵심 키워드들 (모두 포함되어야 함)
     anchor_all = {"열기구", "성냥", "제비뽑기", "내기"}
@@ -998,15 +1515,45 @@ def guess():
         )
     )
     
+    record_event(KIND_GUESS, correct=is_correct)
+    
+    # 게임당 한 번만 리더보드에 기록 (/reset 하면 새 게임)
+    leaderboard_entry = None
+    if is_correct and leaderboard is not None and not session.get('solved'):
+        session['solved'] = True
+        leaderboard_entry = leaderboard.record(
+            session['player'], name[:20] or '익명',
+            tokens_used=20 - session.get('tokens_left', 20),
+            hints_used=len(session.get('used_hints', [])),
+            seconds=time.time() - session.get('started_at', time.time()),
+        )
+    
     return jsonify({
         'correct': is_correct,
         'has_all': has_all,
         'has_any': has_any,
         'has_core_combination': has_core_combination,
         'has_essential_combination': has_essential_combination,
-        'has_wrong_pattern': has_wrong_pattern
+        'has_wrong_pattern': has_wrong_pattern,
+        'leaderboard': leaderboard_entry
     })
 
+@app.route('/leaderboard/top', methods=['GET'])
+def leaderboard_top():
+    """상위 K개 기록"""
+    if leaderboard is None:
+        return jsonify({'error': '리더보드가 비활성화되어 있습니다.'}), 404
+    k = min(max(request.args.get('k', 10, type=int), 1), LEADERBOARD_MAX_K)
+    return jsonify({'total': len(leaderboard), 'top': leaderboard.top(k)})
+
+@app.route('/leaderboard/rank', methods=['GET'])
+def leaderboard_rank():
+    """현재 플레이어의 최고 기록과 순위"""
+    if leaderboard is None:
+        return jsonify({'error': '리더보드가 비활성화되어 있습니다.'}), 404
+    init_session()
+    return jsonify({'total': len(leaderboard), 'entry': leaderboard.rank_of(session['player'])})
+
 @app.route('/state', methods=['GET'])
 def state():
     init_session()
@@ -1022,9 +1569,13 @@ def state():
 @app.route('/reset', methods=['POST'])
 def reset():
     """게임 상태 초기화"""
+    # 끝나는 세션 id로 기록한 뒤 새 세션 시작 (리더보드 플레이어 id는 유지)
+    record_event(KIND_RESET)
+    player = session.get('player')
     session.clear()
-    session['tokens_left'] = 20
-    session['used_hints'] = []
+    if player:
+        session['player'] = player
+    init_session()
     
     return jsonify({
         'tokens_left': 20,
@@ -1052,21 +1603,29 @@ def feedback():
         "timestamp": datetime.now().isoformat()
     }
     
-    # 기존 오버라이드에 추가
-    LEARNED_OVERRIDES.append(new_override)
-    save_learned_overrides(LEARNED_OVERRIDES)
+    # 복제가 켜져 있으면 변경 로그에 먼저 기록해 버전을 받음 (모든 노드가 같은 순서로 적용)
+    if replicator is not None:
+        try:
+            new_override = replicator.publish(new_override)
+        except Exception as e:
+            logger.error(f"Error publishing override: {e}")
+            return jsonify({'error': '피드백을 다른 서버에 전파하지 못했습니다. 잠시 후 다시 시도해주세요.'}), 503
+    
+    apply_override_changes([new_override])
     
     return jsonify({'success': True, 'message': '피드백이 저장되었습니다.'})
 
 @app.route('/answer_feedback', methods=['POST'])
 def answer_feedback():
-    data = request.json
-    guess = data.get('guess', '').strip()
-    is_correct = data.get('is_correct', False)
-    comment = data.get('comment', '').strip()
+    guess = request_text('guess')
+    comment = request_text('comment')
+    data = request.get_json(silent=True)
+    is_correct = data.get('is_correct', False) if isinstance(data, dict) else False
     
     if not guess:
         return jsonify({'error': '정답을 입력해주세요.'}), 400
+    if comment is None or not isinstance(is_correct, bool):
+        return jsonify({'error': 'comment는 문자열, is_correct는 true/false로 입력해주세요.'}), 400
     
     # 새로운 피드백 추가
     new_feedback = {
@@ -1076,12 +1635,101 @@ def answer_feedback():
         "timestamp": datetime.now().isoformat()
     }
     
-    # 기존 피드백에 추가
-    ANSWER_FEEDBACK.append(new_feedback)
-    save_answer_feedback(ANSWER_FEEDBACK)
+    append_answer_feedback(new_feedback)
     
     return jsonify({'success': True, 'message': '정답 피드백이 저장되었습니다.'})
 
+def _feedback_verdict(item) -> str:
+    """정답 피드백의 시스템 판정 (correct/incorrect)"""
+    correct = item.get('system_correct', item.get('is_correct'))
+    return 'correct' if correct else 'incorrect'
+
+# 관리자 API 조회 대상: 이름 -> (파일, 판정 추출, 라벨 추출)
+ADMIN_SOURCES = {
+    'feedback': (ANSWER_FEEDBACK_FILE, _feedback_verdict, lambda item: item.get('user_feedback')),
+    'overrides': (LEARNED_OVERRIDES_FILE, lambda item: item.get('correct_classification'),
+                  lambda item: item.get('original_answer')),
+}
+
+def _admin_error():
+    """관리자 토큰 확인 (통과하면 None)"""
+    if not ADMIN_TOKEN:
+        return jsonify({'error': '관리자 API가 비활성화되어 있습니다.'}), 404
+    token = request.headers.get('X-Admin-Token', '')
+    if not token and request.headers.get('Authorization', '').startswith('Bearer '):
+        token = request.headers['Authorization'][len('Bearer '):]
+    if not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        return jsonify({'error': '관리자 토큰이 올바르지 않습니다.'}), 403
+    return None
+
+def _admin_filter(get_verdict, get_label):
+    """쿼리 인자(verdict, label, since, until)로 원소 조건 함수 생성 (조건이 없으면 None)"""
+    verdict = request.args.get('verdict')
+    label = request.args.get('label')
+    since = request.args.get('since')    # ISO 시각 (이상)
+    until = request.args.get('until')    # ISO 시각 (미만)
+    if not (verdict or label or since or until):
+        return None
+
+    def matches(item) -> bool:
+        if not isinstance(item, dict):
+            return False
+        if verdict and get_verdict(item) != verdict:
+            return False
+        if label and get_label(item) != label:
+            return False
+        timestamp = item.get('timestamp') or ''
+        if since and timestamp < since:
+            return False
+        if until and timestamp >= until:
+            return False
+        return True
+    return matches
+
+@app.route('/admin/<source>', methods=['GET'])
+def admin_list(source):
+    """피드백/오버라이드 페이지 조회 (cursor: 이전 응답의 next_cursor)"""
+    error = _admin_error()
+    if error:
+        return error
+    if source not in ADMIN_SOURCES:
+        return jsonify({'error': f'알 수 없는 조회 대상입니다: {source}'}), 404
+    path, get_verdict, get_label = ADMIN_SOURCES[source]
+    cursor = request.args.get('cursor', '')
+    limit = min(max(request.args.get('limit', 50, type=int), 1), ADMIN_PAGE_MAX)
+    try:
+        page = read_page(path, cursor, limit, _admin_filter(get_verdict, get_label), ADMIN_MAX_SCAN)
+    except InvalidCursor:
+        return jsonify({'error': '커서가 올바르지 않습니다. 처음부터 다시 조회해주세요.'}), 400
+    return jsonify(page)
+
+@app.route('/admin/<source>/export', methods=['GET'])
+def admin_export(source):
+    """피드백/오버라이드 JSONL 내보내기 (파일을 원소 단위로 읽으며 바로 전송)"""
+    error = _admin_error()
+    if error:
+        return error
+    if source not in ADMIN_SOURCES:
+        return jsonify({'error': f'알 수 없는 조회 대상입니다: {source}'}), 404
+    path, get_verdict, get_label = ADMIN_SOURCES[source]
+    predicate = _admin_filter(get_verdict, get_label)
+    items = iter_array(path, request.args.get('cursor', ''))
+    # 응답을 시작하기 전에 커서부터 확인 (첫 원소를 미리 읽음)
+    try:
+        first = next(items, None)
+    except InvalidCursor:
+        return jsonify({'error': '커서가 올바르지 않습니다. 처음부터 다시 조회해주세요.'}), 400
+
+    def generate():
+        if first is None:
+            return
+        for item, _ in itertools.chain([first], items):
+            if predicate is None or predicate(item):
+                yield json.dumps(item, ensure_ascii=False) + "\n"
+
+    return Response(generate(), mimetype='application/x-ndjson',
+                    headers={'Content-Disposition': f'attachment; filename={source}.jsonl'})
+
 @app.route('/reveal')
 def reveal():
     return jsonify({
@@ -1094,6 +1742,69 @@ def stats():
     """성능 통계 확인"""
     return jsonify(get_performance_stats())
 
+@app.route('/ready')
+def ready():
+    """워커 준비 상태 (캐시 워밍 스타트 완료 여부)"""
+    status = 200 if _warm_start_info["ready"] else 503
+    return jsonify(_warm_start_info), status
+
+# 요청 로그 출력 스레드 시작 (종료 시 남은 레코드 출력)
+if REQUEST_LOG_ENABLED:
+    request_log.start()
+    atexit.register(request_log.stop)
+
+# 워커가 요청을 받기 전에 캐시를 채우고, 주기적으로 스냅샷 저장
+if CACHE_WARM_START:
+    warm_start_cache()
+    _snapshotter = PeriodicSnapshotter(CACHE_SNAPSHOT_INTERVAL, snapshot_question_cache)
+    _snapshotter.start()
+    atexit.register(snapshot_question_cache)
+else:
+    _warm_start_info["ready"] = True
+
+# 게임 이벤트 기록 스레드 시작 (종료 시 남은 이벤트 기록)
+if EVENT_STORE_ENABLED:
+    event_store = EventStore(EVENT_DB_FILE)
+    event_store.start()
+    atexit.register(event_store.stop)
+
+# 리더보드 로드 (저장된 기록으로 순위 구조 구성)
+if LEADERBOARD_ENABLED:
+    leaderboard = Leaderboard(LEADERBOARD_DB_FILE)
+
+# 섀도 평가 스레드 시작 (기존 엔진 쪽은 /ask가 실제로 응답한 결과로 비교)
+if SHADOW_ENGINE and SHADOW_FRACTION > 0:
+    shadow_evaluator = ShadowEvaluator(judge_question, load_engine(SHADOW_ENGINE), SHADOW_FRACTION, SHADOW_DIFF_LOG_FILE)
+    shadow_evaluator.start()
+    logger.info(f"Shadow mode enabled: {SHADOW_ENGINE} on {SHADOW_FRACTION:.0%} of /ask requests")
+
+# 계층형 판정 워커 시작 (워커는 서버용 백그라운드 작업 없이 판정 단계만 로드, 파일 변경은 각자 감시)
+# spawn된 워커가 메인 모듈을 다시 실행하는 경우 워커 안에서 또 풀을 만들지 않도록 최상위 프로세스에서만 시작
+if TIERED_EVAL and multiprocessing.current_process().name == "MainProcess":
+    from batch_judge import WORKER_ENV
+    tiered_evaluator = TieredEvaluator(judge_pipeline, TIERED_STAGES, TIERED_BUDGET_MS, TIERED_PROCESSES,
+                                       worker_env={**WORKER_ENV, "HOT_RELOAD_INTERVAL": str(HOT_RELOAD_INTERVAL)})
+    tiered_evaluator.start()
+    atexit.register(tiered_evaluator.stop)
+    logger.info(f"Tiered evaluation enabled: {', '.join(TIERED_STAGES)} in {TIERED_PROCESSES} processes, "
+                f"{TIERED_BUDGET_MS:g} ms budget")
+
+# 다른 노드의 오버라이드를 변경 로그에서 주기적으로 가져와 반영
+if OVERRIDE_REPLICATION:
+    replicator = Replicator(make_transport(OVERRIDE_REPLICATION), REPLICATION_NODE_ID,
+                            apply_override_changes, REPLICATION_STATE_FILE, REPLICATION_INTERVAL)
+    replicator.sync_once()
+    replicator.start()
+    atexit.register(replicator.stop)
+    logger.info(f"Override replication enabled: {OVERRIDE_REPLICATION} as node {REPLICATION_NODE_ID}")
+
+# 디스크의 오버라이드/학습 모델 변경 감시 (다른 워커나 운영자가 수정한 경우)
+if HOT_RELOAD_INTERVAL > 0:
+    _file_watcher = FileWatcher(HOT_RELOAD_INTERVAL)
+    _file_watcher.watch(LEARNED_OVERRIDES_FILE, reload_learned_overrides)
+    _file_watcher.watch(FALLBACK_MODEL_FILE, reload_fallback_model)
+    _file_watcher.start()
+
 if __name__ == '__main__':
     print("사막의 남자 챗봇 서버를 시작합니다...")
     print("브라우저에서 http://127.0.0.1:5000 으로 접속하세요.")
@@ -0,0 +1,107 @@
+"""/ask 최악 지연 시간 검사 (적대적 입력 퍼즈)
+
+정규식 백트래킹이나 전체 재검사를 유발하기 쉬운 입력(반복이 없는 긴 문자열, 거의 반복되는 문자열,
+어미만 반복되는 문자열, 공백/특수문자 투성이, 길이 제한 바로 안팎 등)을 만들어
+Flask 테스트 클라이언트로 /ask에 보내고, 요청별 지연 시간의 최댓값이 기준 이하인지 확인합니다.
+모든 입력은 캐시에 걸리지 않도록 서로 다르게 만듭니다.
+
+사용법:
+    python ask_fuzz.py                       # 기본 2000개, 최대 50ms 기준
+    python ask_fuzz.py --count 10000 --max-ms 20 --seed 7
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+ENDINGS = ["했나요", "있나요", "인가요", "와 관련이 있나요", "을 사용했나요", "?"]
+KEYWORDS = ["남자", "열기구", "성냥", "사막", "제비뽑기", "추락", "상처", "그 뭐", "결국 아무것도"]
+
+
+def _hangul(rng, n: int) -> str:
+    return "".join(chr(0xAC00 + rng.randrange(11172)) for _ in range(n))
+
+
+def adversarial_inputs(rng, max_length: int):
+    """(종류, 질문) 생성 - 종류별로 돌아가며 길이 제한 근처 길이 위주"""
+    generators = {
+        # 반복이 전혀 없는 문자열: 반복 단어 검사의 최악 입력
+        "distinct": lambda n: _hangul(rng, n),
+        # 마지막 한 글자만 달라 반복으로 판정되지 않는 문자열
+        "near_repeat": lambda n: (_hangul(rng, rng.randint(2, 8)) * n)[:n - 1] + _hangul(rng, 1),
+        # 어미 없이 앞부분만 긴 문자열 + 마지막에 어미 일부
+        "ending_tail": lambda n: _hangul(rng, n - 5) + rng.choice(["했나", "와 관련", "을 사용"]) + "?",
+        # 공백이 많은 문자열 (\s* 패턴과 공백 정규화)
+        "spaces": lambda n: " ".join(_hangul(rng, 1) for _ in range(n // 2)),
+        # 특수문자/자모 위주
+        "symbols": lambda n: "".join(rng.choice("!?ㄱㄴㄷㅏㅑ~.,") for _ in range(n - 1)) + _hangul(rng, 1),
+        # 키워드와 어미가 뒤섞인 문자열
+        "keywords": lambda n: " ".join(rng.choice(KEYWORDS + ENDINGS) for _ in range(n))[:n - 1] + _hangul(rng, 1),
+    }
+    kinds = list(generators)
+    i = 0
+    while True:
+        kind = kinds[i % len(kinds)]
+        i += 1
+        length = rng.choice([max_length, max_length - 1, rng.randint(max_length // 2, max_length)])
+        yield kind, generators[kind](max(length, 8))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="/ask 적대적 입력 지연 시간 검사")
+    parser.add_argument("--count", type=int, default=2000, help="보낼 질문 수")
+    parser.add_argument("--max-ms", type=float, default=50.0, help="허용하는 요청당 최대 지연 시간 (밀리초)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    from batch_judge import WORKER_ENV
+    os.environ.update(WORKER_ENV)
+    import app
+
+    client = app.app.test_client()
+    rng = random.Random(args.seed)
+    max_length = app.MAX_QUESTION_LENGTH
+    worst = {}
+
+    def ask(question: str):
+        started = time.perf_counter()
+        response = client.post("/ask", json={"question": question})
+        return response.status_code, (time.perf_counter() - started) * 1000
+
+    # 길이 제한을 넘는 입력은 판정 없이 거절되어야 함
+    for length in (max_length + 1, max_length * 10, 1_000_000):
+        status, elapsed = ask(_hangul(rng, length))
+        if status not in (400, 413):
+            print(f"길이 {length} 질문이 거절되지 않았습니다 (status {status})", file=sys.stderr)
+            return 1
+        worst["oversized"] = max(worst.get("oversized", 0.0), elapsed)
+
+    latencies = []
+    for kind, question in adversarial_inputs(rng, max_length):
+        if len(latencies) >= args.count:
+            break
+        status, elapsed = ask(question)
+        if status != 200:
+            print(f"{kind} 질문 처리 실패 (status {status}): {question[:30]!r}", file=sys.stderr)
+            return 1
+        latencies.append(elapsed)
+        worst[kind] = max(worst.get(kind, 0.0), elapsed)
+
+    latencies.sort()
+    report = {
+        "count": len(latencies),
+        "max_question_length": max_length,
+        "p50_ms": round(latencies[len(latencies) // 2], 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99)], 3),
+        "max_ms": round(latencies[-1], 3),
+        "worst_by_kind_ms": {kind: round(ms, 3) for kind, ms in worst.items()},
+        "limit_ms": args.max_ms,
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0 if report["max_ms"] <= args.max_ms and worst["oversized"] <= args.max_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
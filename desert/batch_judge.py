@@ -0,0 +1,205 @@
+"""대량 질문 재판정 CLI (스트리밍 + 멀티프로세스)
+
+규칙이 바뀐 뒤 과거 질문 로그 전체를 다시 판정할 때 사용합니다.
+입력(JSONL 또는 CSV, 파일 또는 표준 입력)을 청크 단위로 읽어 프로세스 풀에 나눠 주고,
+결과는 입력 순서 그대로 JSONL로 출력합니다. 동시에 처리 중인 청크 수가 제한되어
+입력 크기와 관계없이 메모리 사용량이 일정합니다.
+
+사용법:
+    python batch_judge.py questions.jsonl -o judged.jsonl
+    python batch_judge.py questions.csv --column question --processes 8
+    cat questions.jsonl | python batch_judge.py - > judged.jsonl
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from multiprocessing import Pool
+
+# 워커에서 app을 import할 때 서버용 백그라운드 작업(캐시 프라이밍, 스냅샷, 파일 감시, 요청 로그, 이벤트 기록, 복제, 계층형 판정 풀)은 끔
+WORKER_ENV = {
+    "CACHE_WARM_START": "0",
+    "HOT_RELOAD_INTERVAL": "0",
+    "REQUEST_LOG": "0",
+    "SHADOW_ENGINE": "",
+    "EVENT_STORE": "0",
+    "OVERRIDE_REPLICATION": "",
+    "LEADERBOARD": "0",
+    "TIERED_EVAL": "0",
+}
+
+_judge = None
+
+
+def _init_worker():
+    global _judge
+    os.environ.update(WORKER_ENV)
+    import app
+    _judge = app.judge_question_cached
+
+
+def _judge_chunk(records):
+    """청크 하나를 판정 (워커 프로세스에서 실행)"""
+    results = []
+    for record in records:
+        question = record.get("question") or ""
+        result = _judge(question)
+        output = dict(record)
+        if "verdict" in output:
+            output["previous_verdict"] = output.pop("verdict")
+        output["verdict"] = result["verdict"]
+        output["evidence"] = result.get("evidence", "")
+        output["nl"] = result.get("nl", "")
+        results.append(output)
+    return results
+
+
+def read_records(stream, fmt: str, column: str, skipped=None):
+    """입력 스트림에서 {"question": ...} 레코드를 하나씩 생성
+
+    JSON이 아니거나 문자열/객체가 아닌 줄(123, null, [...] 등)은 건너뛰고 줄 번호를 skipped 리스트에 추가
+    (한 줄 때문에 전체 작업이 멈추지 않도록)
+    """
+    if fmt == "csv":
+        for row in csv.DictReader(stream):
+            record = dict(row)
+            if column != "question":
+                record["question"] = record.pop(column, "")
+            yield record
+        return
+
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            value = json.loads(line)
+        except json.JSONDecodeError:
+            value = None
+        # 문자열만 있는 줄도 허용
+        if isinstance(value, str):
+            yield {"question": value}
+        elif isinstance(value, dict):
+            if column != "question":
+                value["question"] = value.pop(column, "")
+            yield value
+        elif skipped is not None:
+            skipped.append(line_number)
+
+
+def chunked(records, size: int):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class Progress:
+    """표준 에러로 진행 상황과 처리량 출력"""
+
+    def __init__(self, interval: float, stream=sys.stderr):
+        self.interval = interval
+        self.stream = stream
+        self.started = time.perf_counter()
+        self.last_report = self.started
+        self.processed = 0
+        self.changed = 0
+        self.verdicts = {}
+        self.skipped = []    # 건너뛴 입력 줄 번호
+
+    def update(self, results):
+        self.processed += len(results)
+        for result in results:
+            self.verdicts[result["verdict"]] = self.verdicts.get(result["verdict"], 0) + 1
+            if "previous_verdict" in result and result["previous_verdict"] != result["verdict"]:
+                self.changed += 1
+        now = time.perf_counter()
+        if self.interval > 0 and now - self.last_report >= self.interval:
+            self.last_report = now
+            self.stream.write(f"\r{self.processed:,}개 처리 ({self.rate():,.0f}개/초)")
+            self.stream.flush()
+
+    def rate(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+    def summary(self) -> dict:
+        return {
+            "processed": self.processed,
+            "seconds": round(time.perf_counter() - self.started, 3),
+            "questions_per_second": round(self.rate(), 1),
+            "verdicts": self.verdicts,
+            "changed_verdicts": self.changed,
+            "skipped_lines": len(self.skipped),
+            "skipped_line_numbers": self.skipped[:20],
+        }
+
+
+def run(records, output, processes: int, chunk_size: int, progress: Progress):
+    """청크를 풀에 제출하고 입력 순서대로 결과를 기록 (진행 중인 청크 수 제한)"""
+    max_in_flight = processes * 4
+    with Pool(processes, initializer=_init_worker) as pool:
+        in_flight = deque()
+        for chunk in chunked(records, chunk_size):
+            in_flight.append(pool.apply_async(_judge_chunk, (chunk,)))
+            # 가장 오래된 청크부터 기다리므로 출력 순서가 입력 순서와 같음
+            while len(in_flight) >= max_in_flight:
+                _write_results(in_flight.popleft().get(), output, progress)
+        while in_flight:
+            _write_results(in_flight.popleft().get(), output, progress)
+
+
+def _write_results(results, output, progress: Progress):
+    for result in results:
+        output.write(json.dumps(result, ensure_ascii=False) + "\n")
+    progress.update(results)
+
+
+def _detect_format(path: str, fmt: str) -> str:
+    if fmt != "auto":
+        return fmt
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="질문 로그 대량 재판정")
+    parser.add_argument("input", nargs="?", default="-", help="입력 파일 (기본: 표준 입력)")
+    parser.add_argument("-o", "--output", default="-", help="출력 JSONL 파일 (기본: 표준 출력)")
+    parser.add_argument("--format", choices=["auto", "jsonl", "csv"], default="auto")
+    parser.add_argument("--column", default="question", help="질문이 들어 있는 필드/열 이름")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--progress-interval", type=float, default=1.0, help="진행 상황 출력 주기 (초, 0이면 끔)")
+    args = parser.parse_args(argv)
+
+    fmt = _detect_format(args.input, args.format)
+    if args.input == "-":
+        source = sys.stdin
+    else:
+        source = open(args.input, "r", encoding="utf-8", newline="" if fmt == "csv" else None)
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+
+    progress = Progress(args.progress_interval)
+    try:
+        run(read_records(source, fmt, args.column, progress.skipped), output, args.processes, args.chunk_size, progress)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+
+    if args.progress_interval > 0:
+        sys.stderr.write("\n")
+    sys.stderr.write(json.dumps(progress.summary(), ensure_ascii=False) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
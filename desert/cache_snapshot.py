@@ -0,0 +1,103 @@
+"""답변 캐시 스냅샷 저장/복원 (재시작 직후 워밍 스타트용)
+
+스냅샷에는 판정에 영향을 주는 파일(규칙 코드, 오버라이드, 학습 모델)의
+지문(version)이 함께 저장되며, 지문이 달라진 스냅샷은 자동으로 폐기됩니다.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+def compute_version(paths, signature_paths=(), settings=None) -> str:
+    """파일 지문 (paths는 내용, signature_paths는 크기+수정 시각 기준, 없는 파일도 반영, settings는 설정값)"""
+    digest = hashlib.sha256()
+    digest.update(str(SNAPSHOT_FORMAT_VERSION).encode())
+    if settings:
+        digest.update(json.dumps(settings, sort_keys=True, default=str).encode("utf-8"))
+    for path in paths:
+        path = Path(path)
+        digest.update(path.name.encode("utf-8"))
+        try:
+            digest.update(path.read_bytes())
+        except FileNotFoundError:
+            digest.update(b"\0missing")
+    for path in signature_paths:
+        path = Path(path)
+        digest.update(path.name.encode("utf-8"))
+        try:
+            st = path.stat()
+            digest.update(f"{st.st_size}:{st.st_mtime_ns}".encode())
+        except FileNotFoundError:
+            digest.update(b"\0missing")
+    return digest.hexdigest()[:16]
+
+
+def save_snapshot(path, version: str, entries) -> int:
+    """(키, 판정) 목록을 원자적으로 저장 후 저장한 항목 수 반환"""
+    path = Path(path)
+    payload = {
+        "version": version,
+        "saved_at": datetime.now().isoformat(),
+        "entries": [[key, dict(result)] for key, result in entries],
+    }
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False)
+    # 같은 디렉터리 안의 rename은 원자적이므로 읽는 쪽이 반쯤 쓰인 파일을 보지 않음
+    os.replace(tmp_path, path)
+    return len(payload["entries"])
+
+
+def load_snapshot(path, version: str):
+    """지문이 일치하는 스냅샷의 (키, 판정) 목록 반환, 없거나 오래되었으면 None"""
+    path = Path(path)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Discarding unreadable cache snapshot {path}: {e}")
+        _discard(path)
+        return None
+
+    if payload.get("version") != version:
+        logger.info(f"Discarding stale cache snapshot {path} (rules or overrides changed)")
+        _discard(path)
+        return None
+    return [(key, result) for key, result in payload.get("entries", [])]
+
+
+def _discard(path):
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+class PeriodicSnapshotter(threading.Thread):
+    """일정 간격으로 스냅샷 콜백을 호출하는 데몬 스레드"""
+
+    def __init__(self, interval: float, callback):
+        super().__init__(name="cache-snapshot", daemon=True)
+        self.interval = interval
+        self.callback = callback
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.callback()
+            except Exception as e:
+                logger.error(f"Error in cache snapshot: {e}")
+
+    def stop(self):
+        self._stopped.set()
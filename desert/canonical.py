@@ -0,0 +1,51 @@
+"""질문 정식 표기 (오버라이드 키용)
+
+같은 뜻의 질문이 띄어쓰기, 문장부호, 공손한 의문형 어미 차이로
+서로 다른 키가 되지 않도록 하나의 표기로 맞춥니다.
+    "남자는  열기구를 탔습니까!!"  ->  "남자는 열기구를 탔나요?"
+    "사람입니까"                  ->  "사람인가요?"
+    "아닙니까?"                   ->  "아닌가요?"  (부정 표현은 부정 표현으로 유지)
+"""
+import re
+import unicodedata
+
+# 표기 규칙이 바뀌면 올림 (컴파일된 아티팩트 등 정식 표기로 저장된 키의 유효성 확인용)
+CANONICAL_VERSION = 1
+
+_PUNCT = re.compile(r"[^\w\s]|_")
+_SPACE = re.compile(r"\s+")
+_WORD_END = r"(?=\s|$)"
+
+# 고정 어미 (앞의 것부터 적용)
+_ENDINGS = [
+    (re.compile("습니까" + _WORD_END), "나요"),
+    (re.compile("닙니까" + _WORD_END), "닌가요"),   # 아닙니까 -> 아닌가요
+    (re.compile("입니까" + _WORD_END), "인가요"),
+]
+# 받침 ㅂ + 니까 (갑니까 -> 가나요, 됩니까 -> 되나요)
+_B_FINAL_ENDING = re.compile("([가-힣])니까" + _WORD_END)
+
+_HANGUL_BASE = 0xAC00
+_JONGSEONG_COUNT = 28
+_JONGSEONG_B = 17
+
+
+def _drop_b_final(match) -> str:
+    syllable = match.group(1)
+    offset = ord(syllable) - _HANGUL_BASE
+    if offset % _JONGSEONG_COUNT != _JONGSEONG_B:
+        return match.group(0)
+    return chr(ord(syllable) - _JONGSEONG_B) + "나요"
+
+
+def canonicalize(text: str) -> str:
+    """정식 표기 반환, 글자가 하나도 남지 않으면 빈 문자열"""
+    text = unicodedata.normalize("NFC", text).casefold()
+    text = _SPACE.sub(" ", _PUNCT.sub(" ", text)).strip()
+    if not text:
+        return ""
+    for pattern, replacement in _ENDINGS:
+        text = pattern.sub(replacement, text)
+    text = _B_FINAL_ENDING.sub(_drop_b_final, text)
+    # 질문으로만 쓰이므로 끝의 문장부호는 물음표 하나로 통일
+    return text + "?"
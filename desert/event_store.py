@@ -0,0 +1,321 @@
+"""게임 이벤트 저장소 (SQLite WAL + 배치 삽입 + 일별 집계 테이블)
+
+/ask, /hint, /guess, /reset 요청을 작은 이벤트로 기록합니다.
+요청 스레드는 제한된 큐에 넣기만 하고, 별도 스레드가 모아서 한 트랜잭션으로 씁니다.
+질문/근거 문자열은 별도 테이블에 한 번만 저장하고 이벤트에는 정수 id만 남기며,
+같은 트랜잭션에서 일별 집계(rollup)를 갱신하므로 이벤트가 수천만 건이 되어도
+집계 조회는 rollup만 읽습니다.
+
+사용법:
+    python event_store.py summary [--db events.db] [--since 2025-10-01]
+    python event_store.py export-verdicts > verdicts.jsonl   # fallback_model.py train --verdicts
+"""
+import argparse
+import json
+import logging
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).parent
+DEFAULT_DB_FILE = BASE_DIR / "events.db"
+
+# 이벤트 종류 (저장 공간을 줄이기 위해 정수로 기록)
+KIND_ASK = 1
+KIND_HINT = 2
+KIND_GUESS = 3
+KIND_RESET = 4
+KIND_NAMES = {KIND_ASK: "ask", KIND_HINT: "hint", KIND_GUESS: "guess", KIND_RESET: "reset"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    text TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS labels (
+    id INTEGER PRIMARY KEY,
+    text TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    kind INTEGER NOT NULL,
+    session TEXT,
+    question_id INTEGER,
+    verdict TEXT,
+    evidence_id INTEGER,
+    correct INTEGER,
+    hint_index INTEGER
+);
+CREATE INDEX IF NOT EXISTS events_kind_ts ON events(kind, ts);
+CREATE INDEX IF NOT EXISTS events_session_ts ON events(session, ts);
+CREATE INDEX IF NOT EXISTS events_question ON events(question_id) WHERE question_id IS NOT NULL;
+-- 일별 집계: metric = 'kind' | 'question' | 'evidence' | 'hint' | 'guess'
+CREATE TABLE IF NOT EXISTS rollup (
+    day TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    key INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (day, metric, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS rollup_metric_day ON rollup(metric, day);
+"""
+
+# 폴백 모델 학습용 내보내기에서 제외할 근거 (기본값이거나 모델 자신의 판정)
+NON_TRAINING_EVIDENCE = {"학습 모델", "애매한 질문", "시나리오 기반", "입력 오류", "처리 오류", "시스템 오류"}
+
+
+def connect(path, readonly: bool = False) -> sqlite3.Connection:
+    if readonly:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    else:
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+    return conn
+
+
+class EventStore(threading.Thread):
+    """이벤트를 모아서 배치로 기록하는 데몬 스레드"""
+
+    def __init__(self, path=DEFAULT_DB_FILE, max_queue: int = 50000,
+                 batch_size: int = 500, flush_interval: float = 0.5, id_cache_size: int = 100000):
+        super().__init__(name="event-store", daemon=True)
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.id_cache_size = id_cache_size
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stopped = threading.Event()
+        self._question_ids = OrderedDict()
+        self._label_ids = {}
+        self.recorded = 0
+        self.dropped = 0
+        self.batches = 0
+
+    # -- 요청 스레드에서 호출 ------------------------------------------------
+
+    def record(self, kind: int, session=None, question=None, verdict=None,
+               evidence=None, correct=None, hint_index=None):
+        """이벤트 하나를 대기열에 추가 (가득 차면 버리고 개수만 셈)"""
+        try:
+            self._queue.put_nowait((time.time(), kind, session, question, verdict, evidence, correct, hint_index))
+        except queue.Full:
+            self.dropped += 1
+
+    # -- 기록 스레드 ---------------------------------------------------------
+
+    def run(self):
+        conn = connect(self.path)
+        try:
+            while not (self._stopped.is_set() and self._queue.empty()):
+                batch = self._next_batch()
+                if batch:
+                    try:
+                        self._write_batch(conn, batch)
+                    except sqlite3.Error as e:
+                        # 롤백된 질문/근거 id가 남지 않도록 id 캐시도 비움
+                        self._question_ids.clear()
+                        self._label_ids.clear()
+                        logger.error(f"Error writing {len(batch)} events: {e}")
+        finally:
+            conn.close()
+
+    def _next_batch(self):
+        batch = []
+        try:
+            batch.append(self._queue.get(timeout=self.flush_interval))
+        except queue.Empty:
+            return batch
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _question_id(self, conn, text):
+        if text is None:
+            return None
+        qid = self._question_ids.get(text)
+        if qid is not None:
+            self._question_ids.move_to_end(text)
+            return qid
+        conn.execute("INSERT OR IGNORE INTO questions(text) VALUES (?)", (text,))
+        qid = conn.execute("SELECT id FROM questions WHERE text = ?", (text,)).fetchone()[0]
+        self._question_ids[text] = qid
+        if len(self._question_ids) > self.id_cache_size:
+            self._question_ids.popitem(last=False)
+        return qid
+
+    def _label_id(self, conn, text):
+        if text is None:
+            return None
+        lid = self._label_ids.get(text)
+        if lid is None:
+            conn.execute("INSERT OR IGNORE INTO labels(text) VALUES (?)", (text,))
+            lid = conn.execute("SELECT id FROM labels WHERE text = ?", (text,)).fetchone()[0]
+            self._label_ids[text] = lid
+        return lid
+
+    def _write_batch(self, conn, batch):
+        rows = []
+        rollup = Counter()
+        with conn:
+            for ts, kind, session, question, verdict, evidence, correct, hint_index in batch:
+                day = time.strftime("%Y-%m-%d", time.localtime(ts))
+                qid = self._question_id(conn, question)
+                lid = self._label_id(conn, evidence)
+                rows.append((ts, kind, session, qid, verdict, lid,
+                             None if correct is None else int(correct), hint_index))
+                rollup[(day, "kind", kind)] += 1
+                if qid is not None:
+                    rollup[(day, "question", qid)] += 1
+                if lid is not None:
+                    rollup[(day, "evidence", lid)] += 1
+                if hint_index is not None:
+                    rollup[(day, "hint", hint_index)] += 1
+                if correct is not None:
+                    rollup[(day, "guess", int(correct))] += 1
+
+            conn.executemany(
+                "INSERT INTO events(ts, kind, session, question_id, verdict, evidence_id, correct, hint_index) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.executemany(
+                "INSERT INTO rollup(day, metric, key, count) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(day, metric, key) DO UPDATE SET count = count + excluded.count",
+                [(day, metric, key, count) for (day, metric, key), count in rollup.items()],
+            )
+        self.recorded += len(rows)
+        self.batches += 1
+
+    def stop(self, timeout: float = 5.0):
+        """대기 중인 이벤트를 모두 기록한 뒤 종료"""
+        self._stopped.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def stats(self) -> dict:
+        return {
+            "recorded": self.recorded,
+            "batches": self.batches,
+            "queued": self._queue.qsize(),
+            "dropped": self.dropped,
+        }
+
+
+# ---------------------------------------------------------------------------
+# 집계 조회 (rollup 테이블만 사용)
+# ---------------------------------------------------------------------------
+
+def top_questions(conn, limit: int = 20, since: str = "0000-00-00"):
+    return conn.execute(
+        "SELECT q.text, SUM(r.count) AS n FROM rollup r JOIN questions q ON q.id = r.key "
+        "WHERE r.metric = 'question' AND r.day >= ? GROUP BY r.key ORDER BY n DESC LIMIT ?",
+        (since, limit),
+    ).fetchall()
+
+
+def evidence_distribution(conn, since: str = "0000-00-00"):
+    return conn.execute(
+        "SELECT l.text, SUM(r.count) AS n FROM rollup r JOIN labels l ON l.id = r.key "
+        "WHERE r.metric = 'evidence' AND r.day >= ? GROUP BY r.key ORDER BY n DESC",
+        (since,),
+    ).fetchall()
+
+
+def _metric_counts(conn, metric: str, since: str) -> dict:
+    return dict(conn.execute(
+        "SELECT key, SUM(count) FROM rollup WHERE metric = ? AND day >= ? GROUP BY key",
+        (metric, since),
+    ).fetchall())
+
+
+def hint_usage(conn, since: str = "0000-00-00") -> dict:
+    """힌트 순번별 사용 횟수와 질문 대비 힌트 비율"""
+    by_index = _metric_counts(conn, "hint", since)
+    kinds = _metric_counts(conn, "kind", since)
+    asks = kinds.get(KIND_ASK, 0)
+    hints = kinds.get(KIND_HINT, 0)
+    return {
+        "hints": hints,
+        "by_index": {str(k): v for k, v in sorted(by_index.items())},
+        "hints_per_100_questions": round(hints / asks * 100, 2) if asks else 0.0,
+    }
+
+
+def guess_success_rate(conn, since: str = "0000-00-00") -> dict:
+    counts = _metric_counts(conn, "guess", since)
+    total = counts.get(0, 0) + counts.get(1, 0)
+    return {
+        "guesses": total,
+        "correct": counts.get(1, 0),
+        "success_rate": round(counts.get(1, 0) / total, 4) if total else 0.0,
+    }
+
+
+def summary(conn, since: str = "0000-00-00", limit: int = 20) -> dict:
+    kinds = _metric_counts(conn, "kind", since)
+    return {
+        "events": {KIND_NAMES.get(k, str(k)): v for k, v in sorted(kinds.items())},
+        "top_questions": top_questions(conn, limit, since),
+        "evidence_distribution": evidence_distribution(conn, since),
+        "hint_usage": hint_usage(conn, since),
+        "guess_success": guess_success_rate(conn, since),
+    }
+
+
+def export_verdicts(conn, out):
+    """질문별 최신 판정을 JSONL로 내보내기 (폴백 모델 학습용)"""
+    placeholders = ",".join("?" * len(NON_TRAINING_EVIDENCE))
+    cursor = conn.execute(
+        "SELECT q.text, e.verdict FROM events e "
+        "JOIN questions q ON q.id = e.question_id "
+        "JOIN labels l ON l.id = e.evidence_id "
+        "WHERE e.id IN (SELECT MAX(id) FROM events WHERE kind = ? GROUP BY question_id) "
+        f"AND e.verdict IN ('yes', 'no') AND l.text NOT IN ({placeholders})",
+        (KIND_ASK, *sorted(NON_TRAINING_EVIDENCE)),
+    )
+    count = 0
+    for text, verdict in cursor:
+        out.write(json.dumps({"question": text, "verdict": verdict}, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="게임 이벤트 집계 조회")
+    parser.add_argument("--db", default=str(DEFAULT_DB_FILE))
+    sub = parser.add_subparsers(dest="command", required=True)
+    summary_parser = sub.add_parser("summary", help="상위 질문, 근거 분포, 힌트 사용, 정답률")
+    summary_parser.add_argument("--since", default="0000-00-00", help="YYYY-MM-DD 이후만 집계")
+    summary_parser.add_argument("--limit", type=int, default=20)
+    sub.add_parser("export-verdicts", help="질문별 최신 판정을 JSONL로 출력")
+    args = parser.parse_args(argv)
+
+    conn = connect(args.db, readonly=True)
+    try:
+        if args.command == "summary":
+            print(json.dumps(summary(conn, args.since, args.limit), ensure_ascii=False, indent=2))
+        else:
+            export_verdicts(conn, sys.stdout)
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""학습된 폴백 분류기 (문자 n-gram 해시 특징 + 선형 모델)
+
+규칙 단계에서 결정되지 않은 질문을 위한 마지막 판단 단계입니다.
+
+학습 (오프라인, scikit-learn 필요):
+    python fallback_model.py train
+    python fallback_model.py train --verdicts verdicts.jsonl --output fallback_model.npz
+
+추론 (런타임, numpy만 사용):
+    model = load_fallback_model(BASE_DIR / "fallback_model.npz")
+    label, confidence = model.predict("남자는 열기구를 탔나요?")
+"""
+import argparse
+import json
+import re
+import sys
+import zlib
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # numpy가 없으면 폴백 모델 단계는 비활성화됨
+    np = None
+
+BASE_DIR = Path(__file__).parent
+DEFAULT_MODEL_FILE = BASE_DIR / "fallback_model.npz"
+LEARNED_OVERRIDES_FILE = BASE_DIR / "learned_overrides.json"
+
+# 아티팩트 포맷 버전 (특징 추출 방식이 바뀌면 올릴 것)
+MODEL_FORMAT_VERSION = 1
+
+# 특징 해싱 기본값
+DEFAULT_N_FEATURES = 2 ** 14
+DEFAULT_NGRAM_RANGE = (1, 3)
+
+LABELS = ("no", "yes")
+
+
+def _normalize(text: str) -> str:
+    text = text.lower().strip()
+    return re.sub(r"\s+", " ", text)
+
+
+def hashed_features(text: str, n_features: int, ngram_min: int, ngram_max: int):
+    """문자 n-gram을 (인덱스, 부호) 목록으로 해싱 (학습/추론 공용)"""
+    padded = f" {_normalize(text)} "
+    mask = n_features - 1
+    indices = []
+    signs = []
+    for n in range(ngram_min, ngram_max + 1):
+        for i in range(len(padded) - n + 1):
+            # crc32는 프로세스마다 값이 바뀌는 hash()와 달리 항상 같은 값을 보장
+            h = zlib.crc32(padded[i:i + n].encode("utf-8"))
+            indices.append(h & mask)
+            signs.append(-1.0 if h & 0x80000000 else 1.0)
+    return indices, signs
+
+
+class FallbackModel:
+    """numpy 가중치만으로 동작하는 이진 선형 분류기"""
+
+    def __init__(self, weights, bias: float, n_features: int, ngram_min: int, ngram_max: int):
+        self.weights = weights
+        self.bias = float(bias)
+        self.n_features = n_features
+        self.ngram_min = ngram_min
+        self.ngram_max = ngram_max
+
+    def predict(self, question: str):
+        """(라벨, 확신도) 반환 - 확신도는 0.5~1.0"""
+        indices, signs = hashed_features(question, self.n_features, self.ngram_min, self.ngram_max)
+        if not indices:
+            return "no", 0.5
+        score = float(np.dot(self.weights[indices], signs)) + self.bias
+        # 오버플로 방지를 위한 클리핑 후 시그모이드
+        p_yes = 1.0 / (1.0 + np.exp(-max(min(score, 30.0), -30.0)))
+        if p_yes >= 0.5:
+            return "yes", float(p_yes)
+        return "no", float(1.0 - p_yes)
+
+
+def load_fallback_model(path=DEFAULT_MODEL_FILE):
+    """아티팩트 로드 (없거나 numpy가 없거나 포맷이 다르면 None)"""
+    if np is None:
+        return None
+    try:
+        with np.load(path) as data:
+            if int(data["format_version"]) != MODEL_FORMAT_VERSION:
+                return None
+            # float16으로 저장된 가중치를 float32로 한 번만 변환
+            weights = data["weights"].astype(np.float32)
+            return FallbackModel(
+                weights,
+                float(data["bias"]),
+                int(data["n_features"]),
+                int(data["ngram_min"]),
+                int(data["ngram_max"]),
+            )
+    except (FileNotFoundError, OSError, KeyError, ValueError):
+        return None
+
+
+# ---------------------------------------------------------------------------
+# 오프라인 학습
+# ---------------------------------------------------------------------------
+
+def load_training_examples(overrides_file=LEARNED_OVERRIDES_FILE, verdict_files=()):
+    """학습된 오버라이드와 기록된 판정(JSONL)에서 (질문, 라벨) 목록 생성"""
+    examples = {}
+    try:
+        with open(overrides_file, "r", encoding="utf-8") as f:
+            for override in json.load(f):
+                label = override.get("correct_classification")
+                if label in LABELS and override.get("question"):
+                    examples[override["question"]] = label
+    except FileNotFoundError:
+        pass
+
+    # 기록된 판정은 {"question": ..., "verdict": ...} 형식의 JSONL
+    for path in verdict_files:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                label = record.get("verdict")
+                question = record.get("question")
+                # 오버라이드(사람이 교정한 답)가 기록된 판정보다 우선
+                if label in LABELS and question and question not in examples:
+                    examples[question] = label
+
+    return list(examples.items())
+
+
+def train(examples, n_features=DEFAULT_N_FEATURES, ngram_range=DEFAULT_NGRAM_RANGE, c=1.0):
+    """해시 특징 위에 로지스틱 회귀 학습 후 (가중치, 편향) 반환"""
+    # scikit-learn은 학습 시에만 필요
+    from scipy.sparse import csr_matrix
+    from sklearn.linear_model import LogisticRegression
+
+    ngram_min, ngram_max = ngram_range
+    rows, cols, values = [], [], []
+    for row, (question, _) in enumerate(examples):
+        indices, signs = hashed_features(question, n_features, ngram_min, ngram_max)
+        rows.extend([row] * len(indices))
+        cols.extend(indices)
+        values.extend(signs)
+    # 같은 (행, 열)은 csr_matrix가 합산해줌
+    X = csr_matrix((values, (rows, cols)), shape=(len(examples), n_features), dtype=np.float32)
+    y = np.array([1 if label == "yes" else 0 for _, label in examples])
+
+    if len(set(y.tolist())) < 2:
+        raise ValueError("학습 데이터에 'yes'와 'no' 라벨이 모두 필요합니다.")
+
+    clf = LogisticRegression(C=c, class_weight="balanced", max_iter=1000)
+    clf.fit(X, y)
+    return clf.coef_[0], clf.intercept_[0]
+
+
+def export_model(path, weights, bias, n_features, ngram_range):
+    """가중치를 압축된 numpy 아티팩트로 저장 (float16)"""
+    np.savez_compressed(
+        path,
+        format_version=np.int32(MODEL_FORMAT_VERSION),
+        weights=np.asarray(weights, dtype=np.float16),
+        bias=np.float32(bias),
+        n_features=np.int32(n_features),
+        ngram_min=np.int32(ngram_range[0]),
+        ngram_max=np.int32(ngram_range[1]),
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="폴백 분류기 학습/평가")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    train_parser = sub.add_parser("train", help="오버라이드와 기록된 판정으로 학습 후 아티팩트 생성")
+    train_parser.add_argument("--overrides", default=str(LEARNED_OVERRIDES_FILE))
+    train_parser.add_argument("--verdicts", action="append", default=[], help="판정 기록 JSONL (여러 번 지정 가능)")
+    train_parser.add_argument("--output", default=str(DEFAULT_MODEL_FILE))
+    train_parser.add_argument("--n-features", type=int, default=DEFAULT_N_FEATURES)
+    train_parser.add_argument("--ngram-max", type=int, default=DEFAULT_NGRAM_RANGE[1])
+    train_parser.add_argument("-C", type=float, default=1.0, dest="c")
+
+    predict_parser = sub.add_parser("predict", help="아티팩트로 질문 판단")
+    predict_parser.add_argument("question")
+    predict_parser.add_argument("--model", default=str(DEFAULT_MODEL_FILE))
+
+    args = parser.parse_args(argv)
+
+    if args.command == "train":
+        if args.n_features & (args.n_features - 1):
+            parser.error("--n-features는 2의 거듭제곱이어야 합니다.")
+        examples = load_training_examples(args.overrides, args.verdicts)
+        ngram_range = (DEFAULT_NGRAM_RANGE[0], args.ngram_max)
+        weights, bias = train(examples, args.n_features, ngram_range, args.c)
+        export_model(args.output, weights, bias, args.n_features, ngram_range)
+        size_kb = Path(args.output).stat().st_size / 1024
+        print(f"{len(examples)}개 예제로 학습 완료 -> {args.output} ({size_kb:.1f} KB)")
+        return 0
+
+    model = load_fallback_model(args.model)
+    if model is None:
+        print(f"모델을 불러올 수 없습니다: {args.model}", file=sys.stderr)
+        return 1
+    label, confidence = model.predict(args.question)
+    print(json.dumps({"verdict": label, "confidence": round(confidence, 4)}, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""데이터 파일 읽기-수정-쓰기용 프로세스 간 잠금
+
+여러 워커 프로세스가 같은 JSON 파일에 항목을 추가할 때, 한 워커가 읽은 뒤 쓰기 전에
+다른 워커가 쓴 내용을 덮어쓰지 않도록 파일 옆의 잠금 파일(.이름.lock)에 배타 잠금을 겁니다.
+같은 프로세스의 스레드끼리도 서로 기다리도록 스레드 잠금을 함께 잡습니다.
+"""
+import os
+import threading
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:    # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """with 블록 동안 path에 대한 배타 잠금 (프로세스/스레드 모두)"""
+
+    def __init__(self, path):
+        path = Path(path)
+        self.path = path.with_name(f".{path.name}.lock")
+        self._thread_lock = threading.Lock()
+        self._fd = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        try:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                else:
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            except BaseException:
+                os.close(fd)
+                raise
+        except BaseException:
+            self._thread_lock.release()
+            raise
+        self._fd = fd
+        return self
+
+    def __exit__(self, *exc):
+        fd, self._fd = self._fd, None
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+            self._thread_lock.release()
@@ -0,0 +1,120 @@
+"""편집 거리 기반 유사 문자열 인덱스 (SymSpell 방식 삭제 사전)
+
+등록할 때 각 문자열에서 글자를 최대 max_distance개 지운 변형을 모두 사전에 넣어 두고,
+조회할 때도 질문의 삭제 변형만 사전에서 찾아 후보를 모은 뒤 실제 거리를 확인합니다.
+전체 목록을 훑지 않으므로 등록된 문자열 수와 관계없이 조회 비용이 거의 일정합니다.
+
+문자열은 비교 전에 소문자화하고 공백/문장부호를 제거한 뒤 한글 음절을 자모로 분해하므로
+띄어쓰기 차이는 거리 0, 자모 하나의 오타(받침 하나 등)는 거리 1로 취급됩니다.
+음절 하나가 통째로 다른 경우(입었나요/벗었나요)는 자모 2~3개가 달라 거리 1 안에 들지 않습니다.
+최소 길이는 분해 전 글자(음절) 수 기준입니다.
+"""
+import re
+import unicodedata
+
+_IGNORED = re.compile(r"[\s\W_]+", re.UNICODE)
+
+
+def compact_text(text: str) -> str:
+    """비교용 정규화 (NFC + 소문자 + 공백/문장부호 제거 후 자모 분해)"""
+    return unicodedata.normalize("NFD", _IGNORED.sub("", unicodedata.normalize("NFC", text).lower()))
+
+
+def compact_length(key: str) -> int:
+    """compact_text 결과의 글자(음절) 수"""
+    return len(unicodedata.normalize("NFC", key))
+
+
+def delete_variants(text: str, max_distance: int):
+    """text에서 글자를 최대 max_distance개 지운 모든 변형 (text 자신 포함)"""
+    variants = {text}
+    frontier = {text}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for word in frontier:
+            for i in range(len(word)):
+                next_frontier.add(word[:i] + word[i + 1:])
+        next_frontier -= variants
+        variants |= next_frontier
+        frontier = next_frontier
+    return variants
+
+
+def bounded_distance(a: str, b: str, limit: int) -> int:
+    """인접 전치를 포함한 편집 거리 (limit를 넘으면 limit + 1 반환)"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if a == b:
+        return 0
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = current[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > limit:
+            return limit + 1
+        previous_previous, previous = previous, current
+    return previous[-1] if previous[-1] <= limit else limit + 1
+
+
+class FuzzyIndex:
+    """삭제 사전으로 최대 max_distance 이내의 가장 가까운 항목 조회"""
+
+    def __init__(self, max_distance: int = 1, min_length: int = 6):
+        self.max_distance = max_distance
+        self.min_length = min_length
+        self._keys = []        # 정규화된 문자열 (자모 분해)
+        self._values = []      # 등록 순서대로의 값
+        self._deletes = {}     # 삭제 변형 -> 항목 번호 튜플 (조회 중에도 안전하도록 통째로 교체)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, text: str, value):
+        key = compact_text(text)
+        if compact_length(key) < self.min_length:
+            return
+        slot = len(self._keys)
+        self._keys.append(key)
+        self._values.append(value)
+        deletes = self._deletes
+        for variant in delete_variants(key, self.max_distance):
+            deletes[variant] = deletes.get(variant, ()) + (slot,)
+
+    def lookup(self, text: str, accept=None):
+        """(값, 거리) 반환, 후보가 없으면 None. accept(값)이 False인 후보는 제외"""
+        key = compact_text(text)
+        if compact_length(key) < self.min_length:
+            return None
+        candidates = set()
+        for variant in delete_variants(key, self.max_distance):
+            candidates.update(self._deletes.get(variant, ()))
+
+        best = None
+        # 거리가 같으면 먼저 등록된 항목 우선
+        for slot in sorted(candidates):
+            distance = bounded_distance(key, self._keys[slot], self.max_distance)
+            if distance > self.max_distance:
+                continue
+            if accept is not None and not accept(self._values[slot]):
+                continue
+            if best is None or distance < best[1]:
+                best = (self._values[slot], distance)
+                if distance == 0:
+                    break
+        return best
+
+    def within(self, text: str, other: str) -> bool:
+        """두 문자열이 이 인덱스 기준으로 서로 매칭될 수 있는지"""
+        a, b = compact_text(text), compact_text(other)
+        if compact_length(a) < self.min_length or compact_length(b) < self.min_length:
+            return False
+        return bounded_distance(a, b, self.max_distance) <= self.max_distance
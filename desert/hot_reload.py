@@ -0,0 +1,57 @@
+"""파일 변경 감시 (mtime/크기 폴링)
+
+다른 워커나 운영자가 디스크의 데이터 파일을 수정하면 콜백을 호출합니다.
+콜백은 감시 스레드에서 실행되므로 요청 처리 경로를 막지 않습니다.
+"""
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def _file_signature(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class FileWatcher(threading.Thread):
+    """등록된 파일들의 변경을 주기적으로 확인하는 데몬 스레드"""
+
+    def __init__(self, interval: float):
+        super().__init__(name="file-watcher", daemon=True)
+        self.interval = interval
+        self._watches = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def watch(self, path, callback):
+        """path가 바뀌면 callback(path) 호출"""
+        with self._lock:
+            self._watches[str(path)] = [_file_signature(path), callback]
+
+    def check_now(self):
+        """변경된 파일의 콜백을 즉시 실행"""
+        with self._lock:
+            watches = list(self._watches.items())
+        for path, entry in watches:
+            signature = _file_signature(path)
+            if signature == entry[0]:
+                continue
+            try:
+                entry[1](path)
+            except Exception as e:
+                # 쓰는 도중의 파일일 수 있으므로 서명을 갱신하지 않고 다음 주기에 재시도
+                logger.error(f"Error reloading {path}: {e}")
+                continue
+            entry[0] = signature
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            self.check_now()
+
+    def stop(self):
+        self._stopped.set()
@@ -0,0 +1,193 @@
+"""JSON 배열 파일 증분 읽기/추가 (관리자 페이지 조회/내보내기, 정답 피드백 저장용)
+
+answer_feedback.json, learned_overrides.json처럼 하나의 JSON 배열로 저장된 파일을
+전체를 파싱하지 않고 원소 단위로 읽습니다. 메모리에는 읽는 중인 청크와 원소 하나만 올라갑니다.
+append_item은 파일 끝의 ']'만 덮어써 원소를 추가하므로 파일 크기와 상관없이 일정한 비용이 듭니다.
+
+커서("바이트위치-체크섬")는 마지막으로 읽은 원소 바로 뒤의 바이트 위치와 그 앞 CURSOR_CHECK_BYTES 바이트의 CRC32입니다.
+저장 방식(json.dump, indent=2)과 append_item은 원소를 뒤에 추가해도 앞 원소들의 바이트를 바꾸지 않으므로,
+파일이 커진 뒤에도 같은 커서로 이어 읽을 수 있고 마지막 커서로 새로 추가된 원소만 가져올 수 있습니다.
+원소가 수정/삭제되어 파일이 다시 쓰이면 커서가 가리키는 위치의 앞 내용이 달라지므로 InvalidCursor입니다
+(커서 바로 앞 내용이 우연히 같게 다시 쓰인 경우까지 구분하지는 못함).
+"""
+import codecs
+import json
+import os
+import re
+import textwrap
+import zlib
+
+CHUNK_SIZE = 64 * 1024
+CURSOR_CHECK_BYTES = 64
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+
+
+class InvalidCursor(ValueError):
+    """커서가 파일의 원소 경계를 가리키지 않음 (형식 오류, 파일이 다시 쓰임 등)"""
+
+
+_CURSOR_RE = re.compile(r"(\d+)-([0-9a-f]{8})")
+
+
+def _checksum(f, offset: int) -> str:
+    f.seek(max(0, offset - CURSOR_CHECK_BYTES))
+    data = f.read(min(offset, CURSOR_CHECK_BYTES))
+    return f"{zlib.crc32(data):08x}"
+
+
+def make_cursor(path, offset: int) -> str:
+    """바이트 위치를 커서로 (처음이면 빈 문자열)"""
+    if not offset:
+        return ""
+    with open(path, "rb") as f:
+        return f"{offset}-{_checksum(f, offset)}"
+
+
+class _Reader:
+    """바이트 위치를 추적하며 UTF-8 텍스트를 청크 단위로 읽는 버퍼"""
+
+    def __init__(self, f, offset: int):
+        self._f = f
+        self._decode = codecs.getincrementaldecoder("utf-8")().decode
+        self.buf = ""
+        self.pos = 0              # buf 안의 읽기 위치
+        self.base = 0             # 바이트 위치를 계산해 둔 buf 안의 위치
+        self.offset = offset      # buf[base]의 파일 내 바이트 위치
+        self.eof = False
+
+    def fill(self) -> bool:
+        """청크 하나를 더 읽음 (읽은 부분은 버림), 더 읽을 것이 없으면 False"""
+        if self.eof:
+            return False
+        if self.pos:
+            self.tell()
+            self.buf, self.pos, self.base = self.buf[self.pos:], 0, 0
+        data = self._f.read(CHUNK_SIZE)
+        self.eof = not data
+        self.buf += self._decode(data, final=self.eof)
+        return not self.eof
+
+    def peek(self, skip: str = _WHITESPACE) -> str:
+        """skip 문자들을 건너뛴 다음 문자 (파일 끝이면 빈 문자열)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in skip:
+                self.pos += 1
+            if self.pos < len(self.buf) or not self.fill():
+                return self.buf[self.pos:self.pos + 1]
+
+    def decode_value(self):
+        """현재 위치의 JSON 값 하나 (청크 경계에 걸리면 더 읽어서 다시 시도)"""
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # 숫자처럼 끝이 정해지지 않은 값은 뒤에 글자가 더 있어야 완결
+            if end == len(self.buf) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def tell(self) -> int:
+        """현재 위치의 파일 내 바이트 위치 (마지막으로 계산한 곳부터만 인코딩)"""
+        self.offset += len(self.buf[self.base:self.pos].encode("utf-8"))
+        self.base = self.pos
+        return self.offset
+
+
+def iter_array(path, cursor: str = ""):
+    """cursor 이후의 (원소, 다음 원소의 바이트 위치)를 차례로 반환 (파일이 없으면 아무것도 반환하지 않음)
+
+    커서가 원소 경계가 아니거나 그 뒤 내용이 JSON 배열 원소가 아니면 InvalidCursor
+    """
+    offset = 0
+    if cursor:
+        match = _CURSOR_RE.fullmatch(cursor)
+        if not match:
+            raise InvalidCursor(cursor)
+        offset = int(match.group(1))
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        if offset:
+            raise InvalidCursor(cursor)
+        return
+    with f:
+        if offset and _checksum(f, offset) != match.group(2):
+            raise InvalidCursor(cursor)
+        f.seek(offset)
+        reader = _Reader(f, offset)
+        expected = "[" if offset == 0 else ",]"
+        try:
+            head = reader.peek()
+            if not head or head not in expected:
+                raise InvalidCursor(cursor)
+            reader.pos += 1
+            if head == "]":
+                return
+            while True:
+                head = reader.peek(_WHITESPACE + ",")
+                if head in ("]", ""):
+                    return
+                item = reader.decode_value()
+                yield item, reader.tell()
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            # 글자 중간이나 문자열/객체 안을 가리키는 커서
+            raise InvalidCursor(cursor) from None
+
+
+def read_page(path, cursor: str = "", limit: int = 50, predicate=None, max_scan: int = 10000) -> dict:
+    """조건에 맞는 원소를 최대 limit개 읽음
+
+    조건에 맞는 원소가 드물어도 응답 시간이 일정하도록 한 번에 최대 max_scan개까지만 훑고,
+    다음 커서를 돌려줍니다 (done이 True여도 나중에 추가된 원소는 같은 커서로 이어 읽을 수 있음).
+    """
+    items = []
+    scanned = 0
+    offset = None
+    done = True
+    for item, offset in iter_array(path, cursor):
+        scanned += 1
+        if predicate is None or predicate(item):
+            items.append(item)
+        if len(items) >= limit or scanned >= max_scan:
+            done = False
+            break
+    next_cursor = cursor if offset is None else make_cursor(path, offset)
+    return {"items": items, "next_cursor": next_cursor, "scanned": scanned, "done": done}
+
+
+def append_item(path, item, indent: int = 2):
+    """배열 파일 끝의 ']'를 덮어써 원소 하나 추가 (json.dump(indent=2)와 같은 모양, 호출하는 쪽에서 잠금)
+
+    파일이 없거나 비어 있으면 원소 하나짜리 배열로 만들고, 배열로 끝나지 않는 파일이면 ValueError
+    """
+    element = textwrap.indent(json.dumps(item, ensure_ascii=False, indent=indent), " " * indent).encode("utf-8")
+    try:
+        f = open(path, "r+b")
+    except FileNotFoundError:
+        f = open(path, "w+b")
+    with f:
+        end = f.seek(0, os.SEEK_END)
+        tail_start = max(0, end - CHUNK_SIZE)
+        f.seek(tail_start)
+        tail = f.read().rstrip()
+        if not tail:
+            f.seek(0)
+            f.write(b"[\n" + element + b"\n]")
+            f.truncate()
+            return
+        if not tail.endswith(b"]"):
+            raise ValueError(f"{path}: JSON 배열로 끝나지 않는 파일")
+        body = tail[:-1].rstrip()
+        if not body:
+            raise ValueError(f"{path}: 배열의 끝을 찾을 수 없음")
+        separator = b"\n" if body.endswith(b"[") else b",\n"
+        # 마지막 원소(또는 '[') 바로 뒤부터 덮어쓰므로 앞 원소들의 바이트 위치와 커서는 그대로
+        f.seek(tail_start + len(body))
+        f.write(separator + element + b"\n]")
+        f.truncate()
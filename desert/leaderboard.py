@@ -0,0 +1,245 @@
+"""리더보드 (해결한 게임 기록 + 순위 조회)
+
+플레이어마다 가장 좋은 기록 하나만 순위에 올립니다.
+순위 기준: 사용한 질문 토큰 수 -> 사용한 힌트 수 -> 걸린 시간 -> 먼저 해결한 순.
+
+메모리에는 구간 너비를 함께 저장하는 스킵 리스트(순서 통계 구조)를 두어
+삽입/삭제/순위/k번째 조회가 모두 O(log n)이고, 상위 K개는 O(log n + K)입니다.
+기록은 SQLite에 저장하며, 각 행의 seq(갱신할 때마다 증가)로 다른 워커가 추가한
+기록만 골라 메모리 구조에 반영합니다.
+"""
+import math
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_DB_FILE = Path(__file__).parent / "leaderboard.db"
+
+_MAX_LEVEL = 32
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key, level: int):
+        self.key = key
+        self.next = [None] * level
+        self.width = [1] * level
+
+
+class IndexableSkipList:
+    """정렬된 키 목록 (키는 서로 달라야 함)
+
+    width[level]은 해당 레벨에서 다음 노드까지 건너뛰는 원소 수이므로,
+    탐색하며 너비를 더하면 순위를, 너비를 빼 가며 내려가면 k번째 원소를 찾을 수 있습니다.
+    """
+
+    def __init__(self):
+        self._tail = _Node(None, 0)
+        self._head = _Node(None, _MAX_LEVEL)
+        self._head.next = [self._tail] * _MAX_LEVEL
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _chain(self, key):
+        """레벨별로 key 바로 앞 노드와, 그 노드까지의 위치"""
+        chain = [None] * _MAX_LEVEL
+        positions = [0] * _MAX_LEVEL
+        node, position = self._head, 0
+        tail = self._tail
+        for level in reversed(range(_MAX_LEVEL)):
+            while node.next[level] is not tail and node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+            positions[level] = position
+        return chain, positions
+
+    def insert(self, key):
+        chain, positions = self._chain(key)
+        level_count = min(_MAX_LEVEL, 1 - int(math.log2(random.random() or 1e-300)))
+        node = _Node(key, level_count)
+        position = positions[0] + 1    # 새 노드의 위치 (head = 0)
+        for level in range(level_count):
+            prev = chain[level]
+            node.next[level] = prev.next[level]
+            prev.next[level] = node
+            node.width[level] = prev.width[level] - (position - positions[level]) + 1
+            prev.width[level] = position - positions[level]
+        for level in range(level_count, _MAX_LEVEL):
+            chain[level].width[level] += 1
+        self._size += 1
+
+    def remove(self, key) -> bool:
+        chain, _ = self._chain(key)
+        node = chain[0].next[0]
+        if node is self._tail or node.key != key:
+            return False
+        for level in range(len(node.next)):
+            prev = chain[level]
+            prev.width[level] += node.width[level] - 1
+            prev.next[level] = node.next[level]
+        for level in range(len(node.next), _MAX_LEVEL):
+            chain[level].width[level] -= 1
+        self._size -= 1
+        return True
+
+    def rank(self, key) -> int:
+        """key보다 앞선 원소 수 (0부터 시작하는 순위)"""
+        _, positions = self._chain(key)
+        return positions[0]
+
+    def _node_at(self, index: int):
+        node, remaining = self._head, index + 1
+        for level in reversed(range(_MAX_LEVEL)):
+            while node.next[level] is not self._tail and node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        return node
+
+    def __getitem__(self, index: int):
+        if not 0 <= index < self._size:
+            raise IndexError(index)
+        return self._node_at(index).key
+
+    def slice(self, start: int, count: int):
+        """start번째부터 최대 count개"""
+        if start >= self._size or count <= 0:
+            return []
+        node = self._node_at(max(0, start))
+        keys = []
+        while node is not self._tail and len(keys) < count:
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+
+def connect(path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path), check_same_thread=False, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS leaderboard ("
+        "player TEXT PRIMARY KEY, name TEXT NOT NULL, tokens_used INTEGER NOT NULL, "
+        "hints_used INTEGER NOT NULL, seconds REAL NOT NULL, solved_at REAL NOT NULL, seq INTEGER NOT NULL)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS leaderboard_seq ON leaderboard (seq)")
+    conn.commit()
+    return conn
+
+
+def _sort_key(tokens_used, hints_used, seconds, solved_at, player):
+    return (tokens_used, hints_used, seconds, solved_at, player)
+
+
+class Leaderboard:
+    """SQLite에 저장되는 리더보드 + 메모리 순위 구조"""
+
+    def __init__(self, path=DEFAULT_DB_FILE):
+        self._conn = connect(path)
+        self._lock = threading.Lock()
+        self._ranking = IndexableSkipList()
+        self._entries = {}    # 플레이어 -> (정렬 키, 이름)
+        self._last_seq = 0
+        self.refresh()
+
+    def refresh(self) -> int:
+        """다른 워커가 저장한 기록 반영 (마지막으로 본 seq 이후만)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT player, name, tokens_used, hints_used, seconds, solved_at, seq "
+                "FROM leaderboard WHERE seq > ? ORDER BY seq", (self._last_seq,)
+            ).fetchall()
+            for player, name, tokens_used, hints_used, seconds, solved_at, seq in rows:
+                self._apply(player, name, _sort_key(tokens_used, hints_used, seconds, solved_at, player))
+                self._last_seq = seq
+            return len(rows)
+
+    def _apply(self, player, name, key) -> bool:
+        current = self._entries.get(player)
+        if current is not None:
+            if current[0] <= key:
+                return False
+            self._ranking.remove(current[0])
+        self._ranking.insert(key)
+        self._entries[player] = (key, name)
+        return True
+
+    def record(self, player: str, name: str, tokens_used: int, hints_used: int, seconds: float) -> dict:
+        """해결한 게임 기록 (기존 기록보다 좋을 때만 순위 갱신)"""
+        self.refresh()
+        solved_at = time.time()
+        seconds = round(seconds, 3)
+        key = _sort_key(tokens_used, hints_used, seconds, solved_at, player)
+        with self._lock:
+            current = self._entries.get(player)
+            improved = current is None or key < current[0]
+            if improved:
+                with self._conn:
+                    # seq는 저장소 전체에서 증가하는 갱신 번호 (쓰기 트랜잭션 안에서 계산)
+                    # refresh 이후 다른 워커가 더 좋은 기록을 썼으면 덮어쓰지 않음 (WHERE)
+                    cursor = self._conn.execute(
+                        "INSERT INTO leaderboard (player, name, tokens_used, hints_used, seconds, solved_at, seq) "
+                        "VALUES (?, ?, ?, ?, ?, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM leaderboard)) "
+                        "ON CONFLICT(player) DO UPDATE SET name = excluded.name, tokens_used = excluded.tokens_used, "
+                        "hints_used = excluded.hints_used, seconds = excluded.seconds, "
+                        "solved_at = excluded.solved_at, seq = excluded.seq "
+                        "WHERE (excluded.tokens_used, excluded.hints_used, excluded.seconds) "
+                        "< (leaderboard.tokens_used, leaderboard.hints_used, leaderboard.seconds)",
+                        (player, name, tokens_used, hints_used, seconds, solved_at),
+                    )
+                improved = cursor.rowcount > 0
+                # 메모리 순위는 저장이 끝난 뒤에만 갱신 (쓰기가 실패하면 예외로 빠져나감)
+                if improved:
+                    self._apply(player, name, key)
+        if not improved:
+            # 다른 워커가 먼저 쓴 더 좋은 기록을 반영
+            self.refresh()
+        with self._lock:
+            entry = self._entry(player)
+        entry["improved"] = improved
+        return entry
+
+    def _entry(self, player: str):
+        current = self._entries.get(player)
+        if current is None:
+            return None
+        key, name = current
+        return {
+            "rank": self._ranking.rank(key) + 1,
+            "name": name,
+            "tokens_used": key[0],
+            "hints_used": key[1],
+            "seconds": key[2],
+        }
+
+    def top(self, k: int = 10) -> list:
+        self.refresh()
+        with self._lock:
+            keys = self._ranking.slice(0, k)
+            return [
+                {
+                    "rank": i + 1,
+                    "name": self._entries[key[4]][1],
+                    "tokens_used": key[0],
+                    "hints_used": key[1],
+                    "seconds": key[2],
+                }
+                for i, key in enumerate(keys)
+            ]
+
+    def rank_of(self, player: str):
+        """플레이어의 최고 기록과 순위 (기록이 없으면 None)"""
+        self.refresh()
+        with self._lock:
+            return self._entry(player)
+
+    def __len__(self):
+        return len(self._ranking)
+
+    def close(self):
+        self._conn.close()
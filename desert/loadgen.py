@@ -0,0 +1,281 @@
+"""부하 생성기 - 실제와 비슷한 질문/힌트/정답 트래픽 재생
+
+learned_overrides.json의 질문과 answer_feedback.json의 정답 시도로
+가상 플레이어별 시나리오를 만들고, 플레이어마다 별도의 세션(쿠키)으로
+서버에 요청을 보냅니다. 결과는 JSON으로 출력됩니다.
+
+사용법:
+    python loadgen.py --start-server --players 50 --concurrency 20 --ramp-up 5
+    python loadgen.py --url http://127.0.0.1:5000 --players 200 --output report.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from http.cookies import SimpleCookie
+from pathlib import Path
+from urllib.parse import urlsplit
+
+BASE_DIR = Path(__file__).parent
+LEARNED_OVERRIDES_FILE = BASE_DIR / "learned_overrides.json"
+ANSWER_FEEDBACK_FILE = BASE_DIR / "answer_feedback.json"
+
+# 데이터 파일이 비어 있을 때 사용할 기본 질문/정답
+DEFAULT_QUESTIONS = ["남자는 열기구를 탔나요?", "성냥으로 제비뽑기를 했나요?", "남자는 떨어져 죽었나요?"]
+DEFAULT_GUESSES = ["열기구에서 성냥으로 제비뽑기를 해서 희생자로 뽑혀 뛰어내렸다."]
+
+
+def _load_json_list(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def load_corpus():
+    """(질문 목록, 정답 시도 목록) 로드"""
+    questions = [o["question"] for o in _load_json_list(LEARNED_OVERRIDES_FILE) if o.get("question")]
+    guesses = []
+    for fb in _load_json_list(ANSWER_FEEDBACK_FILE):
+        # 이전 형식(guess)과 현재 형식(answer_text)을 모두 지원
+        text = fb.get("answer_text") or fb.get("guess")
+        if text:
+            guesses.append(text)
+    return questions or DEFAULT_QUESTIONS, guesses or DEFAULT_GUESSES
+
+
+def build_script(rng, questions, guesses, max_questions=20, max_hints=3):
+    """가상 플레이어 한 명의 요청 순서 생성"""
+    script = [("POST", "/reset", {}), ("GET", "/state", None)]
+    n_questions = rng.randint(3, max_questions)
+    hint_at = set(rng.sample(range(n_questions), k=min(rng.randint(0, max_hints), n_questions)))
+    for i in range(n_questions):
+        script.append(("POST", "/ask", {"question": rng.choice(questions)}))
+        if i in hint_at:
+            script.append(("POST", "/hint", {}))
+    # 정답은 한두 번 시도
+    for _ in range(rng.randint(1, 2)):
+        script.append(("POST", "/guess", {"guess": rng.choice(guesses)}))
+    return script
+
+
+class HttpSession:
+    """쿠키 저장소를 가진 최소한의 asyncio HTTP/1.1 클라이언트 (요청마다 연결)"""
+
+    def __init__(self, host, port, timeout):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.cookies = SimpleCookie()
+
+    async def request(self, method, path, payload=None):
+        body = b"" if payload is None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        headers = [
+            f"{method} {path} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            "Connection: close",
+            "Accept: application/json",
+        ]
+        if payload is not None:
+            headers.append("Content-Type: application/json")
+            headers.append(f"Content-Length: {len(body)}")
+        if self.cookies:
+            headers.append("Cookie: " + "; ".join(f"{k}={m.value}" for k, m in self.cookies.items()))
+        raw = ("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body
+
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+        try:
+            writer.write(raw)
+            await writer.drain()
+            response = await asyncio.wait_for(reader.read(), self.timeout)
+        finally:
+            writer.close()
+
+        head, _, _ = response.partition(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split(" ", 2)[1])
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            if name.lower() == "set-cookie":
+                self.cookies.load(value.strip())
+        return status
+
+
+class RouteStats:
+    """경로별 집계 (지연 시간은 성공 응답만, 4xx와 5xx/연결 오류는 따로)"""
+
+    def __init__(self):
+        self.latencies = []
+        self.client_errors = 0
+        self.errors = 0
+
+    @property
+    def count(self):
+        return len(self.latencies) + self.client_errors + self.errors
+
+    def report(self):
+        lat = sorted(self.latencies)
+        count = self.count
+
+        def pct(p):
+            if not lat:
+                return None
+            return round(lat[min(len(lat) - 1, int(p * len(lat)))] * 1000, 2)
+
+        return {
+            "requests": count,
+            "client_errors": self.client_errors,
+            "client_error_rate": round(self.client_errors / count, 4) if count else 0.0,
+            "errors": self.errors,
+            "error_rate": round(self.errors / count, 4) if count else 0.0,
+            "p50_ms": pct(0.50),
+            "p99_ms": pct(0.99),
+            "max_ms": round(lat[-1] * 1000, 2) if lat else None,
+        }
+
+
+async def run_player(player_id, script, client, semaphore, stats, start_delay):
+    await asyncio.sleep(start_delay)
+    for method, path, payload in script:
+        route = stats.setdefault(path, RouteStats())
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                status = await client.request(method, path, payload)
+            except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+                route.errors += 1
+                continue
+            elapsed = time.perf_counter() - started
+        # 4xx(힌트 소진, 입력 거절 등)는 서버 오류(5xx)와 따로 집계하고 성공 지연 시간에는 넣지 않음
+        if status >= 500:
+            route.errors += 1
+        elif status >= 400:
+            route.client_errors += 1
+        else:
+            route.latencies.append(elapsed)
+
+
+async def run_load(host, port, players, concurrency, ramp_up, seed, timeout):
+    questions, guesses = load_corpus()
+    rng = random.Random(seed)
+    semaphore = asyncio.Semaphore(concurrency)
+    stats = {}
+    tasks = []
+    for player_id in range(players):
+        script = build_script(rng, questions, guesses)
+        # 램프업 구간 동안 플레이어 시작 시간을 고르게 분산
+        delay = ramp_up * player_id / players if players else 0
+        client = HttpSession(host, port, timeout)
+        tasks.append(run_player(player_id, script, client, semaphore, stats, delay))
+
+    started = time.perf_counter()
+    await asyncio.gather(*tasks)
+    duration = time.perf_counter() - started
+
+    total = sum(s.count for s in stats.values())
+    client_errors = sum(s.client_errors for s in stats.values())
+    errors = sum(s.errors for s in stats.values())
+    return {
+        "players": players,
+        "concurrency": concurrency,
+        "ramp_up_seconds": ramp_up,
+        "duration_seconds": round(duration, 3),
+        "total_requests": total,
+        "throughput_rps": round(total / duration, 2) if duration else 0.0,
+        "client_error_rate": round(client_errors / total, 4) if total else 0.0,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "routes": {path: s.report() for path, s in sorted(stats.items())},
+    }
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_local_server(port, data_dir):
+    """app.py를 별도 프로세스로 실행 (디버그/리로더 없이, 스레드 모드)
+
+    이벤트/리더보드 DB와 섀도 비교 로그는 data_dir에 쓰고, 캐시 스냅샷과 오버라이드 복제는 끄므로
+    부하 테스트가 실제 데이터 파일을 바꾸지 않습니다.
+    """
+    code = f"import app; app.app.run(host='127.0.0.1', port={port}, threaded=True)"
+    data_dir = Path(data_dir)
+    env = dict(
+        os.environ,
+        FLASK_ENV="production",
+        EVENT_DB=str(data_dir / "events.db"),
+        LEADERBOARD_DB=str(data_dir / "leaderboard.db"),
+        SHADOW_DIFF_LOG=str(data_dir / "shadow_diff.jsonl"),
+        CACHE_WARM_START="0",
+        OVERRIDE_REPLICATION="",
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-c", code],
+        cwd=BASE_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("서버 프로세스가 시작 중 종료되었습니다.")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError("서버가 30초 안에 준비되지 않았습니다.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="사막의 남자 챗봇 부하 생성기")
+    parser.add_argument("--url", default="http://127.0.0.1:5000", help="대상 서버 주소")
+    parser.add_argument("--start-server", action="store_true", help="로컬 서버를 직접 띄워서 테스트")
+    parser.add_argument("--players", type=int, default=50, help="가상 플레이어 수")
+    parser.add_argument("--concurrency", type=int, default=20, help="동시 요청 수 상한")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="모든 플레이어가 시작하기까지 걸리는 시간(초)")
+    parser.add_argument("--timeout", type=float, default=10.0, help="요청별 타임아웃(초)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="결과 JSON 파일 경로 (기본: 표준 출력)")
+    args = parser.parse_args(argv)
+
+    server = None
+    data_dir = None
+    if args.start_server:
+        host, port = "127.0.0.1", _free_port()
+        data_dir = tempfile.TemporaryDirectory(prefix="loadgen-")
+        server = start_local_server(port, data_dir.name)
+    else:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+
+    try:
+        report = asyncio.run(run_load(host, port, args.players, args.concurrency, args.ramp_up, args.seed, args.timeout))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        if data_dir is not None:
+            data_dir.cleanup()
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
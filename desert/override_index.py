@@ -0,0 +1,147 @@
+"""학습된 오버라이드 인덱스
+
+파일을 다시 읽을 때는 새 인덱스를 만들어 전역 참조를 통째로 교체하고,
+오버라이드 몇 개가 추가될 때는 기존 인덱스에 항목을 바로 추가합니다 (extend).
+어느 쪽이든 요청 처리 중인 스레드가 반쯤 만들어진 항목을 보지 않습니다.
+"""
+from answer_cache import intern_verdict
+from fuzzy_index import FuzzyIndex
+
+
+def _identity(question: str) -> str:
+    return question
+
+
+class OverrideIndex:
+    """질문 -> 판정 결과 조회용 인덱스 (정확 일치 + 편집 거리 기반 유사 일치)
+
+    key는 질문을 조회 키로 바꾸는 함수 (등록/조회 모두 같은 키 사용, 기본은 질문 그대로)
+    """
+
+    def __init__(self, overrides, generation: int = 0, fuzzy_distance: int = 1, fuzzy_min_length: int = 6,
+                 key=None):
+        self.overrides = overrides
+        self.key = key or _identity
+        self.generation = generation
+        self.fuzzy_distance = fuzzy_distance
+        self.fuzzy_min_length = fuzzy_min_length
+        self._index = {}
+        self._fuzzy_results = {}
+        self._versions = {}    # 질문 -> 적용된 오버라이드의 복제 버전 (없으면 0)
+        self._fuzzy = FuzzyIndex(fuzzy_distance, fuzzy_min_length) if fuzzy_distance > 0 else None
+        for override in overrides:
+            self._add(override)
+
+    def _add(self, override) -> bool:
+        """오버라이드 하나를 반영, 조회 결과가 바뀌면 True"""
+        question = override.get("question")
+        if not question:
+            return False
+        question = self.key(question)
+        version = override.get("version", 0)
+        current = self._versions.get(question)
+        # 같은 질문은 복제 버전이 낮은(먼저 기록된) 오버라이드가 우선, 버전이 없으면 먼저 등록된 쪽
+        # (노드마다 파일 내 순서가 달라도 같은 결과가 나오도록)
+        if current is not None and current <= version:
+            return False
+        self._versions[question] = version
+        self._index[question] = intern_verdict({
+            "verdict": override["correct_classification"],
+            "evidence": "학습된 오버라이드",
+            "nl": override["correct_answer"]
+        })
+        self._fuzzy_results[question] = intern_verdict({
+            "verdict": override["correct_classification"],
+            "evidence": "학습된 오버라이드 (유사 질문)",
+            "nl": override["correct_answer"]
+        })
+        if current is None and self._fuzzy is not None:
+            self._fuzzy.add(question, question)
+        return True
+
+    def extend(self, overrides):
+        """overrides를 이 인덱스에 바로 반영하고 조회 결과가 바뀐 질문들 반환 (전체 재구성/복사 없음)
+
+        조회 중인 스레드가 있어도 항목 하나가 완성된 뒤에야 보이도록 결과 -> 유사 인덱스 순서로 추가합니다.
+        추가는 한 번에 한 스레드만 해야 합니다 (호출하는 쪽에서 잠금).
+        """
+        self.overrides.extend(overrides)
+        return {self.key(override["question"]) for override in overrides if self._add(override)}
+
+    def __len__(self):
+        return len(self._index)
+
+    def lookup(self, question: str):
+        return self._index.get(self.key(question))
+
+    def lookup_fuzzy(self, question: str, accept=None):
+        """오타/띄어쓰기 변형까지 허용한 조회. accept(오버라이드 질문의 키)가 False면 제외"""
+        if self._fuzzy is None:
+            return None
+        found = self._fuzzy.lookup(self.key(question), accept)
+        return self._fuzzy_results[found[0]] if found else None
+
+    def fuzzy_matches(self, text: str, questions) -> bool:
+        """text가 questions 중 하나와 유사 일치할 수 있는지 (캐시 무효화용)"""
+        if self._fuzzy is None:
+            return False
+        return any(self._fuzzy.within(text, question) for question in questions)
+
+    def items(self):
+        """(질문 키, 판정 결과) - 등록 순서대로"""
+        return iter(self._index.items())
+
+    def changed_questions(self, other):
+        """두 인덱스 사이에 결과가 추가/변경/삭제된 질문들"""
+        return _changed_questions(self, other)
+
+
+def _changed_questions(old, new):
+    changed = set()
+    for question, result in old.items():
+        if new.lookup(question) != result:
+            changed.add(question)
+    for question, _ in new.items():
+        if old.lookup(question) is None:
+            changed.add(question)
+    return changed
+
+
+def _verdict_from_record(record: dict, evidence: str):
+    return intern_verdict({"verdict": record["v"], "evidence": evidence, "nl": record["nl"]})
+
+
+class MappedOverrideIndex:
+    """컴파일된 아티팩트(mmap)를 그대로 조회하는 인덱스 - OverrideIndex와 같은 인터페이스"""
+
+    def __init__(self, artifact, generation: int = 0, key=None):
+        self.artifact = artifact
+        self.key = key or _identity
+        self.generation = generation
+        self.fuzzy_distance = artifact.meta["fuzzy_distance"]
+        self.fuzzy_min_length = artifact.meta["fuzzy_min_length"]
+        # 유사 일치 판정 규칙은 메모리 인덱스와 동일 (캐시 무효화용)
+        self._fuzzy_rules = FuzzyIndex(self.fuzzy_distance, self.fuzzy_min_length)
+
+    def __len__(self):
+        return len(self.artifact)
+
+    def lookup(self, question: str):
+        record = self.artifact.lookup_exact(self.key(question))
+        return _verdict_from_record(record, "학습된 오버라이드") if record else None
+
+    def lookup_fuzzy(self, question: str, accept=None):
+        found = self.artifact.lookup_fuzzy(self.key(question), accept)
+        return _verdict_from_record(found[0], "학습된 오버라이드 (유사 질문)") if found else None
+
+    def fuzzy_matches(self, text: str, questions) -> bool:
+        if self.fuzzy_distance <= 0:
+            return False
+        return any(self._fuzzy_rules.within(text, question) for question in questions)
+
+    def items(self):
+        for record in self.artifact.records():
+            yield record["q"], _verdict_from_record(record, "학습된 오버라이드")
+
+    def changed_questions(self, other):
+        return _changed_questions(self, other)
@@ -0,0 +1,131 @@
+"""판정 패턴 목록 정적 분석 CLI
+
+DesertConstants의 패턴 목록은 모두 `any(pattern in q for pattern in 목록)` 방식으로 쓰이므로,
+다른 패턴을 부분 문자열로 포함하는 패턴은 결과에 영향을 주지 못하고 검사 비용만 늘립니다.
+이 도구는 다음을 찾아 보고합니다.
+    duplicates : 같은 목록 안에서 두 번 이상 나오는 패턴
+    subsumed   : 같은 목록의 더 짧은 패턴이 이미 매칭하므로 의미 없는 패턴
+    cross_list : 다른 목록의 패턴과 같거나 포함 관계인 패턴 (앞 단계 목록이 뒤 단계를 가림)
+    over_broad : 한 글자 패턴, 또는 질문 코퍼스의 너무 많은 비율에 매칭되는 패턴
+적중 횟수는 학습된 오버라이드 질문과 이벤트 로그(events.db)의 질문으로 집계합니다.
+
+사용법:
+    python pattern_lint.py                  # 분석 보고서 (JSON)
+    python pattern_lint.py --minimized      # 중복/포함 패턴을 제거한 목록 (JSON)
+"""
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+from itertools import combinations
+
+
+def minimize_patterns(patterns) -> tuple:
+    """any(p in text) 결과가 같은 최소 패턴 튜플 (중복 제거 + 더 짧은 패턴을 포함하는 패턴 제거, 원래 순서 유지)"""
+    unique = list(dict.fromkeys(patterns))
+    kept = set()
+    for pattern in sorted(unique, key=len):
+        if not any(shorter in pattern for shorter in kept):
+            kept.add(pattern)
+    return tuple(pattern for pattern in unique if pattern in kept)
+
+
+def pattern_lists(constants) -> dict:
+    """상수 클래스의 대문자 이름 패턴 목록들"""
+    return {
+        name: list(value)
+        for name, value in vars(constants).items()
+        if name.isupper() and isinstance(value, (list, tuple)) and all(isinstance(p, str) for p in value)
+    }
+
+
+def _hits(patterns, corpus: Counter) -> dict:
+    return {pattern: sum(n for text, n in corpus.items() if pattern in text) for pattern in dict.fromkeys(patterns)}
+
+
+def analyze(lists: dict, corpus: Counter, broad_ratio: float = 0.2) -> dict:
+    """목록별 중복/포함/과도하게 넓은 패턴과 목록 간 겹침 분석"""
+    total = sum(corpus.values())
+    report = {"corpus_questions": total, "lists": {}, "cross_list": []}
+
+    for name, patterns in lists.items():
+        counts = Counter(patterns)
+        minimized = minimize_patterns(patterns)
+        kept = set(minimized)
+        hits = _hits(patterns, corpus)
+        subsumed = []
+        for pattern in dict.fromkeys(patterns):
+            if pattern in kept:
+                continue
+            by = sorted((p for p in minimized if p in pattern), key=len)
+            subsumed.append({"pattern": pattern, "covered_by": by[0], "hits": hits[pattern]})
+        over_broad = []
+        for pattern in minimized:
+            ratio = hits[pattern] / total if total else 0.0
+            if len(pattern) <= 1 or (total and ratio >= broad_ratio):
+                examples = [text for text in corpus if pattern in text][:3]
+                over_broad.append({"pattern": pattern, "hits": hits[pattern], "ratio": round(ratio, 4), "examples": examples})
+        report["lists"][name] = {
+            "patterns": len(patterns),
+            "minimized": len(minimized),
+            "duplicates": {p: c for p, c in counts.items() if c > 1},
+            "subsumed": subsumed,
+            "over_broad": over_broad,
+            "unused": [p for p in minimized if total and hits[p] == 0],
+            "hits": {p: n for p, n in sorted(hits.items(), key=lambda item: -item[1]) if n},
+        }
+
+    for (name_a, list_a), (name_b, list_b) in combinations(lists.items(), 2):
+        for a in minimize_patterns(list_a):
+            for b in minimize_patterns(list_b):
+                if a in b or b in a:
+                    report["cross_list"].append({
+                        name_a: a,
+                        name_b: b,
+                        "relation": "same" if a == b else ("contains" if b in a else "contained_in"),
+                    })
+    return report
+
+
+def load_corpus(app, db_path=None, since: str = "0000-00-00") -> Counter:
+    """판정 패턴을 검사할 때와 같이 정규화한 질문별 횟수 (오버라이드 질문 + 이벤트 로그)"""
+    corpus = Counter()
+    for override in app.load_learned_overrides():
+        if override.get("question"):
+            corpus[app.normalize_text(override["question"])] += 1
+    if db_path and os.path.exists(db_path):
+        from event_store import connect, top_questions
+        conn = connect(db_path, readonly=True)
+        try:
+            for text, n in top_questions(conn, -1, since):    # LIMIT -1: 전체
+                corpus[app.normalize_text(text)] += n
+        finally:
+            conn.close()
+    return corpus
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="판정 패턴 목록 분석")
+    parser.add_argument("--db", default=None, help="이벤트 DB (기본: EVENT_DB 또는 desert/events.db)")
+    parser.add_argument("--since", default="0000-00-00", help="이 날짜(YYYY-MM-DD) 이후 이벤트만 집계")
+    parser.add_argument("--broad-ratio", type=float, default=0.2, help="이 비율 이상의 질문에 매칭되면 과도하게 넓은 패턴")
+    parser.add_argument("--minimized", action="store_true", help="분석 대신 최소 패턴 목록 출력")
+    args = parser.parse_args(argv)
+
+    from batch_judge import WORKER_ENV
+    os.environ.update(WORKER_ENV)
+    import app
+
+    lists = pattern_lists(app.DesertConstants)
+    if args.minimized:
+        print(json.dumps({name: list(minimize_patterns(p)) for name, p in lists.items()}, ensure_ascii=False, indent=2))
+        return 0
+
+    corpus = load_corpus(app, args.db or app.EVENT_DB_FILE, args.since)
+    print(json.dumps(analyze(lists, corpus, args.broad_ratio), ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
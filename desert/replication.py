@@ -0,0 +1,215 @@
+"""노드 간 학습된 오버라이드 복제 (버전이 매겨진 변경 로그)
+
+/feedback으로 추가된 오버라이드는 공유 변경 로그에 먼저 기록되어 단조 증가하는 버전을 받고,
+각 노드는 마지막으로 적용한 버전 이후의 항목만 주기적으로 가져와 자신의 인덱스/캐시에 반영합니다.
+같은 질문에 대한 오버라이드가 여러 노드에서 들어오면 버전이 낮은 쪽이 이기므로
+적용 순서와 관계없이 모든 노드가 같은 답을 냅니다.
+
+전송 계층은 append(node, override) -> version, fetch(after_version, limit) -> [entry]
+두 메서드만 있으면 되며, 로컬 테스트용으로 공유 디렉터리와 SQLite 구현을 제공합니다.
+    dir:/mnt/shared/desert-changes
+    sqlite:/mnt/shared/desert-changes.db
+"""
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class DirectoryTransport:
+    """공유 디렉터리에 버전 번호 이름의 파일로 변경 로그 기록
+
+    새 버전 파일은 임시 파일을 hard link로 만들기 때문에 이미 있는 번호면 실패하고 다음 번호를 시도합니다.
+    N번을 만드는 쪽은 항상 N-1번이 있는 것을 확인한 뒤이므로 번호에 빈틈이 생기지 않습니다.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._last_seen = 0
+
+    def _versions(self, after: int = 0):
+        versions = []
+        for name in os.listdir(self.path):
+            stem, _, ext = name.partition(".")
+            if ext == "json" and stem.isdigit() and int(stem) > after:
+                versions.append(int(stem))
+        return sorted(versions)
+
+    def append(self, node: str, override) -> int:
+        entry = {"node": node, "ts": datetime.now().isoformat(), "override": override}
+        tmp_path = self.path / f".{node}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        try:
+            version = max([self._last_seen] + self._versions(self._last_seen)) + 1
+            while True:
+                try:
+                    os.link(tmp_path, self.path / f"{version:012d}.json")
+                    self._last_seen = version
+                    return version
+                except FileExistsError:
+                    version += 1
+        finally:
+            os.unlink(tmp_path)
+
+    def fetch(self, after: int, limit: int = 500):
+        entries = []
+        for version in self._versions(after)[:limit]:
+            with open(self.path / f"{version:012d}.json", "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            entry["version"] = version
+            entries.append(entry)
+            self._last_seen = max(self._last_seen, version)
+        return entries
+
+
+class SQLiteTransport:
+    """SQLite AUTOINCREMENT 키를 버전으로 쓰는 변경 로그 (쓰기가 직렬화되므로 커밋 순서 = 버전 순서)"""
+
+    def __init__(self, path):
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS override_changes ("
+            "version INTEGER PRIMARY KEY AUTOINCREMENT, node TEXT NOT NULL, ts TEXT NOT NULL, payload TEXT NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def append(self, node: str, override) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO override_changes (node, ts, payload) VALUES (?, ?, ?)",
+                (node, datetime.now().isoformat(), json.dumps(override, ensure_ascii=False)),
+            )
+            self._conn.commit()
+            return cursor.lastrowid
+
+    def fetch(self, after: int, limit: int = 500):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT version, node, ts, payload FROM override_changes WHERE version > ? ORDER BY version LIMIT ?",
+                (after, limit),
+            ).fetchall()
+        return [
+            {"version": version, "node": node, "ts": ts, "override": json.loads(payload)}
+            for version, node, ts, payload in rows
+        ]
+
+
+def make_transport(spec: str):
+    """'dir:경로' 또는 'sqlite:경로'로 전송 계층 생성"""
+    kind, _, path = spec.partition(":")
+    if kind == "dir" and path:
+        return DirectoryTransport(path)
+    if kind == "sqlite" and path:
+        return SQLiteTransport(path)
+    raise ValueError(f"복제 전송 계층은 'dir:경로' 또는 'sqlite:경로' 형식이어야 합니다: {spec!r}")
+
+
+def default_node_id() -> str:
+    return socket.gethostname()
+
+
+class Replicator(threading.Thread):
+    """변경 로그에 오버라이드를 발행하고, 다른 항목을 주기적으로 가져와 apply(오버라이드 목록, commit)로 반영
+
+    apply는 오버라이드를 파일에 쓴 뒤 같은 잠금 안에서 commit()을 호출해야 하며,
+    commit이 불린 뒤에만 적용 위치를 옮겨 저장합니다 (쓰기가 실패하면 다음 주기에 같은 항목부터 재시도).
+    """
+
+    def __init__(self, transport, node_id: str, apply, state_path, interval: float = 2.0, batch_size: int = 500):
+        super().__init__(name="override-replicator", daemon=True)
+        self.transport = transport
+        self.node_id = node_id
+        self.apply = apply
+        self.state_path = Path(state_path)
+        self.interval = interval
+        self.batch_size = batch_size
+        self.last_version = self._load_state()
+        self.published = 0
+        self.applied = 0
+        self.sync_errors = 0
+        self.last_sync = None
+        self._sync_lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def _load_state(self) -> int:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return int(json.load(f).get("last_version", 0))
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _save_state(self):
+        # 같은 오버라이드 파일을 쓰는 다른 워커가 더 멀리 저장해 두었으면 되돌리지 않음
+        last_version = max(self.last_version, self._load_state())
+        tmp_path = self.state_path.with_name(f".{self.state_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"node": self.node_id, "last_version": last_version}, f)
+        os.replace(tmp_path, self.state_path)
+
+    def publish(self, override) -> dict:
+        """오버라이드를 변경 로그에 기록하고 버전/노드가 붙은 사본 반환"""
+        override = dict(override)
+        override["node"] = self.node_id
+        override["version"] = self.transport.append(self.node_id, override)
+        self.published += 1
+        return override
+
+    def sync_once(self) -> int:
+        """마지막 적용 버전 이후의 변경을 모두 반영하고 반영한 항목 수 반환"""
+        with self._sync_lock:
+            total = 0
+            while True:
+                entries = self.transport.fetch(self.last_version, self.batch_size)
+                if not entries:
+                    break
+                overrides = []
+                for entry in entries:
+                    override = dict(entry["override"])
+                    override["version"] = entry["version"]
+                    override.setdefault("node", entry.get("node"))
+                    overrides.append(override)
+                version = entries[-1]["version"]
+
+                def commit():
+                    # 오버라이드 파일 쓰기에 성공한 뒤 같은 잠금 안에서만 위치를 옮김
+                    self.last_version = version
+                    self._save_state()
+
+                self.apply(overrides, commit)
+                if self.last_version != version:
+                    raise RuntimeError(f"복제 항목 {version}까지 반영하지 못했습니다.")
+                total += len(entries)
+            self.applied += total
+            self.last_sync = datetime.now().isoformat(timespec="seconds")
+            return total
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.sync_once()
+            except Exception as e:
+                self.sync_errors += 1
+                logger.error(f"Error syncing replicated overrides: {e}")
+
+    def stop(self):
+        self._stopped.set()
+
+    def stats(self) -> dict:
+        return {
+            "node": self.node_id,
+            "last_version": self.last_version,
+            "published": self.published,
+            "applied": self.applied,
+            "sync_errors": self.sync_errors,
+            "last_sync": self.last_sync,
+        }
@@ -0,0 +1,93 @@
+"""비동기 구조화(JSON) 요청 로그
+
+요청 스레드는 제한된 크기의 큐에 레코드를 넣기만 하고(가득 차면 버리고 개수만 셈),
+JSON 변환과 출력은 별도 리스너 스레드가 담당합니다.
+많이 발생하는 이벤트는 표본 추출(sampling)로 일부만 기록할 수 있습니다.
+"""
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+
+
+class JsonFormatter(logging.Formatter):
+    """레코드를 한 줄 JSON으로 변환 (리스너 스레드에서 실행)"""
+
+    def format(self, record):
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "event": record.getMessage(),
+        }
+        payload.update(getattr(record, "fields", {}))
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """큐가 가득 차면 기다리지 않고 레코드를 버리는 핸들러"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def prepare(self, record):
+        # 메시지 포맷팅은 리스너 스레드의 JsonFormatter에서 하므로 요청 스레드에서는 생략
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+
+class RequestLogger:
+    """표본 추출과 드롭 카운트를 지원하는 구조화 이벤트 로거"""
+
+    def __init__(self, name="desert.requests", max_queue=10000, sample_rate=1.0, stream=None):
+        self.sample_rate = sample_rate
+        self.sampled_out = 0
+        self.emitted = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._handler = DroppingQueueHandler(self._queue)
+
+        output = logging.StreamHandler(stream or sys.stderr)
+        output.setFormatter(JsonFormatter())
+        self._listener = logging.handlers.QueueListener(self._queue, output)
+
+        self._logger = logging.getLogger(name)
+        self._logger.handlers = [self._handler]
+        self._logger.setLevel(logging.INFO)
+        # 루트 로거의 동기 스트림 핸들러로 전파되지 않도록
+        self._logger.propagate = False
+
+    def start(self):
+        self._listener.start()
+
+    def stop(self):
+        """남은 레코드를 모두 출력한 뒤 리스너 종료"""
+        if self._listener._thread is not None:
+            self._listener.stop()
+
+    def event(self, name: str, sampled: bool = False, level=logging.INFO, **fields):
+        """이벤트 기록 (sampled=True이면 sample_rate 비율로만 기록)"""
+        if sampled and self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            self.sampled_out += 1
+            return
+        self.emitted += 1
+        self._logger.log(level, name, extra={"fields": fields})
+
+    def stats(self) -> dict:
+        return {
+            "emitted": self.emitted,
+            "sampled_out": self.sampled_out,
+            "dropped": self._handler.dropped,
+            "queued": self._queue.qsize(),
+            "sample_rate": self.sample_rate,
+        }
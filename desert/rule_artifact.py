@@ -0,0 +1,350 @@
+"""컴파일된 규칙/오버라이드 아티팩트 (버전이 있는 바이너리 파일, mmap으로 공유)
+
+워커마다 learned_overrides.json을 파싱하고 인덱스를 다시 만드는 대신,
+빌드 단계에서 한 번 만든 해시 테이블을 mmap으로 열어 그대로 조회합니다.
+여러 워커가 같은 페이지 캐시를 공유하며, 시작 시에는 헤더만 읽으므로
+오버라이드가 아무리 많아도 로딩 시간이 일정합니다.
+
+파일 구조 (리틀 엔디언):
+    헤더      : magic(8) + format_version(u32) + section_count(u32)
+    섹션 목록 : [name(16) + offset(u64) + length(u64)] * section_count
+    섹션      : meta(JSON), constants(JSON), records, exact(해시 테이블), fuzzy(해시 테이블)
+
+아티팩트는 빌드할 때마다 새 이름(rules.<빌드 시각>.bin)으로 쓰고 이전 버전은 지웁니다.
+실행 중인 워커가 mmap으로 열어 둔 파일 위에 덮어쓰지 않으므로 Windows에서도 교체할 수 있고,
+지울 수 없는(아직 열려 있는) 이전 버전은 다음 빌드 때 다시 지웁니다.
+
+사용법:
+    python rule_artifact.py build [--output rules.bin]
+    python rule_artifact.py info [--input rules.bin]
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from canonical import CANONICAL_VERSION
+from fuzzy_index import delete_variants, bounded_distance, compact_length, compact_text
+
+BASE_DIR = Path(__file__).parent
+DEFAULT_ARTIFACT_FILE = BASE_DIR / "rules.bin"
+LEARNED_OVERRIDES_FILE = BASE_DIR / "learned_overrides.json"
+
+MAGIC = b"DSRTRULE"
+FORMAT_VERSION = 3
+
+_HEADER = struct.Struct("<8sII")
+_SECTION = struct.Struct("<16sQQ")
+_SLOT = struct.Struct("<QII")     # 키 해시, 레코드 오프셋(테이블 기준), 레코드 길이 (0이면 빈 슬롯)
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+_RECORD_REF = struct.Struct("<II")
+
+
+def _hash(key: bytes) -> int:
+    # 프로세스마다 바뀌는 hash() 대신 고정된 해시 사용
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def artifact_versions(path) -> list:
+    """path(rules.bin) 이름으로 빌드된 아티팩트 파일들 (최신순)"""
+    path = Path(path)
+    versions = []
+    for candidate in path.parent.glob(f"{path.stem}.*{path.suffix}"):
+        stamp = candidate.name[len(path.stem) + 1:len(candidate.name) - len(path.suffix)]
+        if stamp.isdigit():
+            versions.append((int(stamp), candidate))
+    return [candidate for _, candidate in sorted(versions, reverse=True)]
+
+
+def file_signature(path) -> dict:
+    """파일 내용을 읽지 않고 비교할 수 있는 서명 (크기 + 수정 시각)"""
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+# ---------------------------------------------------------------------------
+# 빌드
+# ---------------------------------------------------------------------------
+
+def _build_table(items) -> bytes:
+    """(키 bytes, 값 bytes) 목록으로 선형 탐사 해시 테이블 생성"""
+    n_slots = 1 << max(3, (2 * len(items)).bit_length())
+    mask = n_slots - 1
+    slots = [(0, 0, 0)] * n_slots
+    blob = bytearray()
+    base = _U64.size + n_slots * _SLOT.size
+    for key, value in items:
+        record = _U32.pack(len(key)) + key + value
+        offset = base + len(blob)
+        blob += record
+        h = _hash(key)
+        i = h & mask
+        while slots[i][2]:
+            i = (i + 1) & mask
+        slots[i] = (h, offset, len(record))
+    return _U64.pack(n_slots) + b"".join(_SLOT.pack(*slot) for slot in slots) + bytes(blob)
+
+
+def build_artifact(overrides, constants: dict, output, fuzzy_distance: int = 1,
+                   fuzzy_min_length: int = 6, overrides_signature=None, key=None):
+    """오버라이드와 규칙 상수를 하나의 아티팩트 파일로 컴파일 (질문은 key(질문)으로 저장)"""
+    records = []
+    exact_items = []
+    fuzzy_postings = {}
+    # 런타임 인덱스(OverrideIndex)와 같은 우선순위: 복제 버전이 낮은 쪽, 같으면 먼저 등록된 쪽
+    winners = {}
+    for override in overrides:
+        question = override.get("question")
+        if not question:
+            continue
+        if key is not None:
+            question = key(question)
+        current = winners.get(question)
+        if current is None or override.get("version", 0) < current.get("version", 0):
+            winners[question] = override
+    for question, override in winners.items():
+        ordinal = len(records)
+        compact = compact_text(question)
+        records.append(json.dumps({
+            "q": question,
+            "k": compact,
+            "v": override["correct_classification"],
+            "nl": override["correct_answer"],
+        }, ensure_ascii=False).encode("utf-8"))
+        exact_items.append((question.encode("utf-8"), _U32.pack(ordinal)))
+        if fuzzy_distance > 0 and compact_length(compact) >= fuzzy_min_length:
+            for variant in delete_variants(compact, fuzzy_distance):
+                fuzzy_postings.setdefault(variant, []).append(ordinal)
+
+    # records 섹션: 개수 + (오프셋, 길이) 배열 + 레코드 본문
+    ref_base = _U32.size + len(records) * _RECORD_REF.size
+    refs = bytearray(_U32.pack(len(records)))
+    offset = ref_base
+    for record in records:
+        refs += _RECORD_REF.pack(offset, len(record))
+        offset += len(record)
+    records_section = bytes(refs) + b"".join(records)
+
+    fuzzy_items = [
+        (variant.encode("utf-8"), struct.pack(f"<{len(ordinals)}I", *ordinals))
+        for variant, ordinals in fuzzy_postings.items()
+    ]
+
+    constants_blob = json.dumps(constants, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    meta = {
+        "built_at": datetime.now().isoformat(),
+        "overrides": len(records),
+        "overrides_signature": overrides_signature,
+        "fuzzy_distance": fuzzy_distance,
+        "fuzzy_min_length": fuzzy_min_length,
+        "canonical_version": CANONICAL_VERSION if key is not None else None,
+        "constants_fingerprint": hashlib.sha256(constants_blob).hexdigest()[:16],
+    }
+    sections = [
+        (b"meta", json.dumps(meta, ensure_ascii=False).encode("utf-8")),
+        (b"constants", constants_blob),
+        (b"records", records_section),
+        (b"exact", _build_table(exact_items)),
+        (b"fuzzy", _build_table(fuzzy_items)),
+    ]
+
+    output = Path(output)
+    tmp_path = output.with_name(f".{output.name}.{os.getpid()}.tmp")
+    versioned = output.with_name(f"{output.stem}.{time.time_ns():020d}{output.suffix}")
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(sections)))
+        offset = _HEADER.size + len(sections) * _SECTION.size
+        for name, data in sections:
+            f.write(_SECTION.pack(name, offset, len(data)))
+            offset += len(data)
+        for _, data in sections:
+            f.write(data)
+    # 새 이름으로만 쓰고 mmap으로 열려 있을 수 있는 이전 버전은 덮어쓰지 않음
+    os.replace(tmp_path, versioned)
+    for old in artifact_versions(output)[1:]:
+        try:
+            os.unlink(old)
+        except OSError:
+            pass    # Windows에서 아직 다른 워커가 열어 둔 파일
+    meta["path"] = str(versioned)
+    return meta
+
+
+# ---------------------------------------------------------------------------
+# 런타임 (mmap 조회)
+# ---------------------------------------------------------------------------
+
+class _MappedTable:
+    def __init__(self, buf, start: int):
+        self._buf = buf
+        self._start = start
+        self._n_slots = _U64.unpack_from(buf, start)[0]
+        self._mask = self._n_slots - 1
+
+    def get(self, key: bytes):
+        buf, start = self._buf, self._start
+        h = _hash(key)
+        i = h & self._mask
+        while True:
+            slot_hash, offset, length = _SLOT.unpack_from(buf, start + _U64.size + i * _SLOT.size)
+            if length == 0:
+                return None
+            if slot_hash == h:
+                record = start + offset
+                key_len = _U32.unpack_from(buf, record)[0]
+                if buf[record + 4:record + 4 + key_len] == key:
+                    return buf[record + 4 + key_len:record + length]
+            i = (i + 1) & self._mask
+
+
+class RuleArtifact:
+    """mmap으로 연 아티팩트 (헤더와 섹션 목록만 읽고 나머지는 필요할 때 접근)"""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = _HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._buf.close()
+            raise ValueError(f"지원하지 않는 아티팩트 형식입니다: {path}")
+        self._sections = {}
+        for i in range(count):
+            name, offset, length = _SECTION.unpack_from(self._buf, _HEADER.size + i * _SECTION.size)
+            self._sections[name.rstrip(b"\0").decode()] = (offset, length)
+        self.meta = json.loads(self._section_bytes("meta"))
+        records_start = self._sections["records"][0]
+        self._records_start = records_start
+        self._record_count = _U32.unpack_from(self._buf, records_start)[0]
+        self._exact = _MappedTable(self._buf, self._sections["exact"][0])
+        self._fuzzy = _MappedTable(self._buf, self._sections["fuzzy"][0])
+
+    def _section_bytes(self, name: str) -> bytes:
+        offset, length = self._sections[name]
+        return self._buf[offset:offset + length]
+
+    def __len__(self):
+        return self._record_count
+
+    def constants(self) -> dict:
+        return json.loads(self._section_bytes("constants"))
+
+    def record(self, ordinal: int) -> dict:
+        """오버라이드 레코드 {"q"(질문 키), "k", "v", "nl"}"""
+        offset, length = _RECORD_REF.unpack_from(self._buf, self._records_start + _U32.size + ordinal * _RECORD_REF.size)
+        start = self._records_start + offset
+        return json.loads(self._buf[start:start + length])
+
+    def records(self):
+        for ordinal in range(self._record_count):
+            yield self.record(ordinal)
+
+    def lookup_exact(self, question: str):
+        value = self._exact.get(question.encode("utf-8"))
+        if value is None:
+            return None
+        return self.record(_U32.unpack(value)[0])
+
+    def lookup_fuzzy(self, question: str, accept=None):
+        """(레코드, 거리) 반환 - FuzzyIndex.lookup과 같은 규칙"""
+        distance_limit = self.meta["fuzzy_distance"]
+        key = compact_text(question)
+        if distance_limit <= 0 or compact_length(key) < self.meta["fuzzy_min_length"]:
+            return None
+        candidates = set()
+        for variant in delete_variants(key, distance_limit):
+            postings = self._fuzzy.get(variant.encode("utf-8"))
+            if postings:
+                candidates.update(struct.unpack(f"<{len(postings) // 4}I", postings))
+        best = None
+        for ordinal in sorted(candidates):
+            record = self.record(ordinal)
+            distance = bounded_distance(key, record["k"], distance_limit)
+            if distance > distance_limit:
+                continue
+            if accept is not None and not accept(record["q"]):
+                continue
+            if best is None or distance < best[1]:
+                best = (record, distance)
+                if distance == 0:
+                    break
+        return best
+
+    def close(self):
+        self._buf.close()
+
+
+def load_rule_artifact(path, overrides_file, fuzzy_distance: int, fuzzy_min_length: int):
+    """현재 오버라이드 파일/설정과 일치하는 최신 아티팩트만 반환 (없거나 오래되었으면 None)"""
+    try:
+        current = file_signature(overrides_file)
+    except FileNotFoundError:
+        current = None
+    for candidate in artifact_versions(path):
+        try:
+            artifact = RuleArtifact(candidate)
+        except (FileNotFoundError, ValueError, OSError):
+            continue
+        meta = artifact.meta
+        if (meta.get("overrides_signature") == current
+                and meta.get("fuzzy_distance") == fuzzy_distance
+                and meta.get("fuzzy_min_length") == fuzzy_min_length
+                and meta.get("canonical_version") == CANONICAL_VERSION):
+            return artifact
+        artifact.close()
+    return None
+
+
+def rule_constants(constants) -> dict:
+    """아티팩트에 넣을 규칙 상수 (상수 클래스의 대문자 이름 목록들)"""
+    return {
+        name: list(value)
+        for name, value in vars(constants).items()
+        if name.isupper() and isinstance(value, (list, tuple))
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="규칙/오버라이드 아티팩트 빌드")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_parser = sub.add_parser("build", help="learned_overrides.json과 규칙 상수로 아티팩트 생성")
+    build_parser.add_argument("--output", default=str(DEFAULT_ARTIFACT_FILE))
+    info_parser = sub.add_parser("info", help="아티팩트 메타데이터 출력")
+    info_parser.add_argument("--input", default=str(DEFAULT_ARTIFACT_FILE))
+    args = parser.parse_args(argv)
+
+    if args.command == "info":
+        versions = artifact_versions(args.input)
+        if not versions:
+            print(f"아티팩트가 없습니다: {args.input}", file=sys.stderr)
+            return 1
+        artifact = RuleArtifact(versions[0])
+        print(json.dumps({**artifact.meta, "path": str(versions[0])}, ensure_ascii=False, indent=2))
+        return 0
+
+    # 규칙 상수와 유사 일치 설정은 서버와 같은 값을 쓰도록 app에서 가져옴
+    from batch_judge import WORKER_ENV
+    os.environ.update(WORKER_ENV)
+    import app
+
+    # 서버가 오버라이드를 쓰는 중에 읽지 않도록 같은 잠금 안에서 빌드
+    with app._overrides_file_lock:
+        signature = file_signature(LEARNED_OVERRIDES_FILE)
+        overrides = app.load_learned_overrides()
+        meta = build_artifact(
+            overrides, rule_constants(app.DesertConstants), args.output,
+            app.OVERRIDE_FUZZY_DISTANCE, app.OVERRIDE_FUZZY_MIN_LENGTH, signature, app.canonical_question,
+        )
+    size_kb = Path(meta["path"]).stat().st_size / 1024
+    print(f"오버라이드 {meta['overrides']}개 컴파일 완료 -> {meta['path']} ({size_kb:.1f} KB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
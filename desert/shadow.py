@@ -0,0 +1,138 @@
+"""섀도 모드 - 후보 판단 엔진을 실제 트래픽으로 비교 평가
+
+/ask 요청 중 일부(fraction)를 후보 엔진으로도 판단하되, 응답 경로 밖의
+백그라운드 스레드에서 실행하므로 사용자에게는 기존 엔진의 답만 나갑니다.
+기존 엔진 쪽은 실제로 응답한 결과(캐시/계층형 판정 포함)와 그 지연 시간을 그대로 비교에 씁니다.
+판정(verdict)이 다르면 두 엔진의 근거(evidence)와 함께 diff 로그(JSONL)에 기록하고,
+두 엔진의 지연 시간을 나란히 집계합니다.
+
+후보 엔진은 "모듈:함수" 형식으로 지정하며, 함수는 질문 문자열을 받아
+{"verdict", "evidence", "nl"} dict를 반환해야 합니다.
+"""
+import importlib
+import json
+import logging
+import queue
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+def load_engine(spec: str):
+    """'모듈:함수' 문자열로 후보 엔진 함수 로드"""
+    module_name, _, func_name = spec.partition(":")
+    if not module_name or not func_name:
+        raise ValueError(f"엔진은 '모듈:함수' 형식이어야 합니다: {spec!r}")
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def _percentile(samples, p):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 3)
+
+
+class ShadowEvaluator(threading.Thread):
+    """요청 경로 밖에서 기존/후보 엔진을 비교하는 데몬 스레드"""
+
+    def __init__(self, primary, candidate, fraction: float, diff_log_path,
+                 max_pending: int = 1000, latency_window: int = 2000):
+        super().__init__(name="shadow-evaluator", daemon=True)
+        self.primary = primary
+        self.candidate = candidate
+        self.fraction = fraction
+        self.diff_log_path = diff_log_path
+        self._pending = queue.Queue(maxsize=max_pending)
+        self._primary_ms = deque(maxlen=latency_window)
+        self._candidate_ms = deque(maxlen=latency_window)
+        self.submitted = 0
+        self.dropped = 0
+        self.compared = 0
+        self.verdict_mismatches = 0
+        self.evidence_mismatches = 0
+        self.candidate_errors = 0
+
+    def maybe_submit(self, question: str, served=None, served_ms: float = None):
+        """fraction 비율로 질문과 실제 응답 결과를 섀도 평가 대기열에 넣음 (대기열이 가득 차면 버림)"""
+        if self.fraction <= 0 or random.random() >= self.fraction:
+            return
+        try:
+            self._pending.put_nowait((question, served, served_ms))
+            self.submitted += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def run(self):
+        with open(self.diff_log_path, "a", encoding="utf-8") as diff_log:
+            while True:
+                question, served, served_ms = self._pending.get()
+                try:
+                    record = self.compare(question, served, served_ms)
+                except Exception as e:
+                    logger.error(f"Error in shadow comparison: {e}")
+                    continue
+                if record is not None:
+                    diff_log.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    diff_log.flush()
+
+    def compare(self, question: str, served=None, served_ms: float = None):
+        """응답한 결과(없으면 기존 엔진으로 판단)와 후보 엔진 결과를 비교해 판정이 다르면 diff 레코드 반환"""
+        if served is not None:
+            primary_result, primary_ms = served, served_ms or 0.0
+        else:
+            started = time.perf_counter()
+            primary_result = self.primary(question)
+            primary_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        try:
+            candidate_result = self.candidate(question)
+        except Exception as e:
+            self.candidate_errors += 1
+            candidate_result = {"verdict": "error", "evidence": f"{type(e).__name__}: {e}"}
+        candidate_ms = (time.perf_counter() - started) * 1000
+
+        self._primary_ms.append(primary_ms)
+        self._candidate_ms.append(candidate_ms)
+        self.compared += 1
+
+        primary_evidence = primary_result.get("evidence", "")
+        candidate_evidence = candidate_result.get("evidence", "")
+        if primary_result.get("verdict") == candidate_result.get("verdict"):
+            if primary_evidence != candidate_evidence:
+                self.evidence_mismatches += 1
+            return None
+
+        self.verdict_mismatches += 1
+        return {
+            "ts": datetime.now().isoformat(timespec="seconds"),
+            "q": question,
+            "p": primary_result.get("verdict"),
+            "pe": primary_evidence,
+            "c": candidate_result.get("verdict"),
+            "ce": candidate_evidence,
+            "pms": round(primary_ms, 3),
+            "cms": round(candidate_ms, 3),
+        }
+
+    def stats(self) -> dict:
+        primary_ms = list(self._primary_ms)
+        candidate_ms = list(self._candidate_ms)
+        return {
+            "fraction": self.fraction,
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "compared": self.compared,
+            "verdict_mismatches": self.verdict_mismatches,
+            "evidence_mismatches": self.evidence_mismatches,
+            "candidate_errors": self.candidate_errors,
+            "latency_ms": {
+                "primary": {"p50": _percentile(primary_ms, 0.50), "p99": _percentile(primary_ms, 0.99)},
+                "candidate": {"p50": _percentile(candidate_ms, 0.50), "p99": _percentile(candidate_ms, 0.99)},
+            },
+        }
@@ -0,0 +1,159 @@
+"""판정 단계 파이프라인 (선언 순서대로 실행)
+
+각 단계는 질문을 받아 결과 dict(결정) 또는 None(다음 단계로)을 반환하는 부작용 없는 함수입니다.
+처음 결정한 단계의 결과를 쓰고, 아무 단계도 결정하지 않으면 terminal로 판정합니다.
+
+실행 순서는 고정입니다. 현재 규칙 단계들은 키워드가 겹치는 질문에서 서로 다른 판정/근거를 내므로
+대부분의 단계 쌍이 순서에 의존합니다 (nonsense > external > meaningless > wrong_answer > specific_rules
+> physical_evidence > detailed가 이웃끼리 모두 충돌하고, override는 nonsense와 specific_rules 사이에 묶임).
+결정 빈도/비용에 따라 순서를 바꿀 여지가 거의 없어 재정렬은 하지 않습니다.
+단계별로 결정 수를 집계하고, sample_every번에 한 번꼴로만 실행한 단계들의 시간을 재서
+호출당 비용(지수 이동 평균)을 구합니다 (고정 순서가 실제 비용에 비해 적절한지 판단용).
+
+어떤 단계 쌍이 순서에 의존하는지는 CLI로 확인할 수 있습니다 (입력이 없으면 판정 회귀 검사 코퍼스 사용).
+    python stages.py check [questions.jsonl]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from itertools import combinations
+
+
+def _always():
+    return True
+
+
+class Stage:
+    """판정 단계 하나 (enabled: 지금 결정을 내릴 수 있는지, 꺼진 단계는 계층형 판정에서 맡기지 않음)"""
+
+    def __init__(self, name: str, check, enabled=None):
+        self.name = name
+        self.check = check
+        self.enabled = enabled or _always
+        self.decisions = 0
+        self.sampled_calls = 0
+        self.sampled_decisions = 0
+        self.cost_ns = None    # 호출당 비용 지수 이동 평균 (표본 요청만)
+
+    def observe(self, elapsed_ns: int, decided: bool, alpha: float):
+        self.sampled_calls += 1
+        if decided:
+            self.sampled_decisions += 1
+        self.cost_ns = elapsed_ns if self.cost_ns is None else self.cost_ns + alpha * (elapsed_ns - self.cost_ns)
+
+
+class StagePipeline:
+    """단계들을 선언 순서대로 실행 (sample_every: 단계별 시간을 재는 간격, 0이면 재지 않음)"""
+
+    def __init__(self, stages, terminal, sample_every: int = 100, alpha: float = 0.05):
+        self.stages = tuple(stages)
+        self.terminal = terminal
+        self.sample_every = sample_every
+        self.alpha = alpha
+        self._position = {stage.name: i for i, stage in enumerate(self.stages)}
+        self._runs = 0
+        self.sampled = 0
+        self.terminal_decisions = 0
+
+    def run(self, question: str, skip=frozenset()):
+        """(결과, 결정한 단계 이름) 반환 (skip: 이번에는 건너뛸 단계 이름들)"""
+        self._runs += 1
+        if self.sample_every and self._runs % self.sample_every == 0:
+            self.sampled += 1
+            return self._run_timed(question, skip)
+        for stage in self.stages:
+            if stage.name in skip:
+                continue
+            result = stage.check(question)
+            if result is not None:
+                stage.decisions += 1
+                return result, stage.name
+        self.terminal_decisions += 1
+        return self.terminal(question), "terminal"
+
+    def _run_timed(self, question: str, skip):
+        for stage in self.stages:
+            if stage.name in skip:
+                continue
+            started = time.perf_counter_ns()
+            result = stage.check(question)
+            stage.observe(time.perf_counter_ns() - started, result is not None, self.alpha)
+            if result is not None:
+                stage.decisions += 1
+                return result, stage.name
+        self.terminal_decisions += 1
+        return self.terminal(question), "terminal"
+
+    def preceding(self, decided_by: str, names) -> list:
+        """names 중 decided_by보다 앞선 단계들 (순서대로, terminal이면 전부)"""
+        limit = self._position.get(decided_by, len(self.stages))
+        return [stage.name for stage in self.stages[:limit] if stage.name in names]
+
+    def stage(self, name: str) -> Stage:
+        return self.stages[self._position[name]]
+
+    def stats(self) -> dict:
+        return {
+            "order": [stage.name for stage in self.stages],
+            "sample_every": self.sample_every,
+            "sampled": self.sampled,
+            "terminal_decisions": self.terminal_decisions,
+            "stages": {
+                stage.name: {
+                    "decisions": stage.decisions,
+                    "sampled_calls": stage.sampled_calls,
+                    "decision_rate": round(stage.sampled_decisions / stage.sampled_calls, 4)
+                                     if stage.sampled_calls else None,
+                    "cost_us": round(stage.cost_ns / 1000, 2) if stage.cost_ns is not None else None,
+                }
+                for stage in self.stages
+            },
+        }
+
+
+def find_conflicts(stages, questions):
+    """모든 단계를 각 질문에 실행해, 둘 다 결정하고 결과가 다른(순서가 결과를 바꾸는) 단계 쌍 집계"""
+    conflicts = {}
+    for question in questions:
+        decided = [(stage.name, result) for stage in stages
+                   for result in [stage.check(question)] if result is not None]
+        for (a, result_a), (b, result_b) in combinations(decided, 2):
+            if result_a == result_b:
+                continue
+            entry = conflicts.setdefault((a, b), {"count": 0, "example": question})
+            entry["count"] += 1
+    return [{"stages": list(pair), **entry} for pair, entry in sorted(conflicts.items())]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="판정 단계 순서 의존성 검사")
+    sub = parser.add_subparsers(dest="command", required=True)
+    check_parser = sub.add_parser("check", help="질문들에서 순서가 결과를 바꾸는 단계 쌍 찾기")
+    check_parser.add_argument("input", nargs="?",
+                              help='{"question": ...} 또는 문자열 JSONL (- 이면 표준 입력, 생략하면 회귀 검사 코퍼스)')
+    args = parser.parse_args(argv)
+
+    from batch_judge import WORKER_ENV, read_records
+    os.environ.update(WORKER_ENV)
+    import app
+
+    if args.input is None:
+        from verdict_check import build_corpus
+        questions = build_corpus(app, 1500, 0)
+    else:
+        source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+        try:
+            questions = [record["question"] for record in read_records(source, "jsonl", "question")
+                         if record.get("question")]
+        finally:
+            if source is not sys.stdin:
+                source.close()
+    conflicts = find_conflicts(app.judge_pipeline.stages, questions)
+    print(json.dumps({"questions": len(questions), "order_dependent_pairs": conflicts}, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
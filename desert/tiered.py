@@ -0,0 +1,194 @@
+"""지연 시간 예산이 있는 계층형 판정 (비싼 단계는 프로세스 풀에서 실행)
+
+값싼 규칙 단계는 요청 스레드에서 바로 실행하고, 비싼 단계(유사 일치 검색, 학습 모델 추론 등)는
+원래 순서에서 값싼 단계의 결정보다 앞서고 켜져 있는(Stage.enabled) 경우에만 프로세스 풀에 맡깁니다.
+비싼 단계가 예산 안에 끝나면 원래 순서대로 판정한 것과 같은 결과를 돌려주고,
+예산을 넘기거나 실패하면 값싼 단계의 결과(규칙 기반 판정)에 fallback 표시를 붙여 돌려줍니다.
+
+워커 프로세스는 spawn으로 시작해 판정 모듈을 따로 import하므로 요청 처리 스레드와 상태를 공유하지 않으며,
+오버라이드/모델 파일 변경은 워커의 파일 감시(HOT_RELOAD_INTERVAL 주기)로 반영됩니다.
+"""
+import importlib
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+_worker_pipeline = None
+
+
+def _init_worker(env: dict, pipeline_ref: str):
+    """워커 프로세스 초기화 ('모듈:속성'의 판정 파이프라인 로드)"""
+    global _worker_pipeline
+    os.environ.update(env)
+    module_name, _, attribute = pipeline_ref.partition(":")
+    _worker_pipeline = getattr(importlib.import_module(module_name), attribute)
+
+
+def _run_stage(name: str, question: str):
+    result = _worker_pipeline.stage(name).check(question)
+    # 플라이웨이트 등 dict 하위 클래스는 프로세스 간에 일반 dict로 전달
+    return dict(result) if result is not None else None
+
+
+def _ping():
+    return os.getpid()
+
+
+class TieredEvaluator:
+    """pipeline의 expensive 단계들을 프로세스 풀에서 budget_ms 안에 실행"""
+
+    def __init__(self, pipeline, expensive, budget_ms: float = 50.0, processes: int = 2,
+                 worker_env=None, pipeline_ref: str = "app:judge_pipeline", max_pending: int = None):
+        self.pipeline = pipeline
+        self.expensive = frozenset(expensive)
+        self.budget = budget_ms / 1000
+        self.processes = processes
+        self.worker_env = dict(worker_env or {})
+        self.pipeline_ref = pipeline_ref
+        # 풀이 밀리면 대기열에서 예산을 다 쓰게 되므로 처리 중인 작업이 이 수를 넘으면 바로 규칙 결과 사용
+        self.max_pending = max_pending if max_pending is not None else processes * 4
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.requests = 0
+        self.inline = 0           # 비싼 단계가 필요 없었던 판정
+        self.offloaded = 0        # 프로세스 풀을 사용한 판정
+        self.decided_offloaded = 0
+        self.expired = 0          # 예산 초과
+        self.errors = 0
+        self.shed = 0             # 풀이 밀려 맡기지 않음
+        self.latency_ms = None    # 풀을 사용한 판정의 대기 시간 지수 이동 평균
+
+    def start(self):
+        """워커 프로세스를 미리 띄움 (첫 요청이 프로세스 시작을 기다리지 않도록)"""
+        self._get_executor()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    self.processes, mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker, initargs=(self.worker_env, self.pipeline_ref),
+                )
+                self._spawn_workers(self._executor)
+            return self._executor
+
+    def _spawn_workers(self, executor):
+        """워커를 모두 띄움 (spawn된 워커는 메인 모듈을 다시 실행하므로 시작하는 동안만 워커용 환경 변수 적용)"""
+        saved = {key: os.environ.get(key) for key in self.worker_env}
+        os.environ.update(self.worker_env)
+        try:
+            for _ in range(self.processes):
+                executor.submit(_ping)
+        finally:
+            for key, value in saved.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+
+    def _reset_executor(self, executor):
+        """깨진 풀은 버리고 다음 요청 때 새로 만듦"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _done(self, _future):
+        with self._lock:
+            self._pending -= 1
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def run(self, question: str):
+        """(결과, 결정한 단계 이름) 반환, 예산 초과/실패 시 결과에 fallback 표시"""
+        self._count("requests")
+        result, decided_by = self.pipeline.run(question, skip=self.expensive)
+        # 꺼진 단계(유사 일치 거리 0, 모델 없음 등)는 결정을 내리지 않으므로 맡기지 않음
+        needed = [name for name in self.pipeline.preceding(decided_by, self.expensive)
+                  if self.pipeline.stage(name).enabled()]
+        if not needed:
+            self._count("inline")
+            return result, decided_by
+
+        with self._lock:
+            if self._pending + len(needed) > self.max_pending:
+                self.shed += 1
+                return self._fallback(result, "shed"), decided_by
+            self._pending += len(needed)
+            self.offloaded += 1
+        executor = self._get_executor()
+        started = time.perf_counter()
+        deadline = started + self.budget
+        futures = []
+        try:
+            # 필요한 비싼 단계를 동시에 실행하고 원래 순서대로 첫 결정을 채택
+            for name in needed:
+                future = executor.submit(_run_stage, name, question)
+                future.add_done_callback(self._done)
+                futures.append(future)
+            for name, future in zip(needed, futures):
+                decided = future.result(timeout=max(0.0, deadline - time.perf_counter()))
+                if decided is not None:
+                    self._count("decided_offloaded")
+                    return decided, name
+            return result, decided_by
+        except FutureTimeout:
+            self._count("expired")
+            return self._fallback(result, "budget"), decided_by
+        except BrokenProcessPool as e:
+            self._count("errors")
+            logger.error(f"Tiered evaluation pool broken, recreating: {e}")
+            self._reset_executor(executor)
+            return self._fallback(result, "error"), decided_by
+        except Exception as e:
+            self._count("errors")
+            logger.error(f"Error in tiered evaluation: {e}")
+            return self._fallback(result, "error"), decided_by
+        finally:
+            # submit 전에 실패한 단계 몫의 처리 중 수 되돌림
+            if len(futures) < len(needed):
+                with self._lock:
+                    self._pending -= len(needed) - len(futures)
+            for future in futures:
+                future.cancel()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self.latency_ms = elapsed_ms if self.latency_ms is None else self.latency_ms + 0.05 * (elapsed_ms - self.latency_ms)
+
+    @staticmethod
+    def _fallback(result: dict, reason: str) -> dict:
+        """규칙 기반 결과에 fallback 사유 표시 (근거는 evidence에 그대로 남음)"""
+        return {**result, "fallback": reason}
+
+    def stop(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        fallbacks = self.expired + self.errors + self.shed
+        return {
+            "budget_ms": self.budget * 1000,
+            "processes": self.processes,
+            "expensive_stages": sorted(self.expensive),
+            "requests": self.requests,
+            "inline": self.inline,
+            "offloaded": self.offloaded,
+            "decided_offloaded": self.decided_offloaded,
+            "budget_expired": self.expired,
+            "errors": self.errors,
+            "shed": self.shed,
+            "pending": self._pending,
+            "fallback_rate": round(fallbacks / self.requests, 4) if self.requests else None,
+            "offload_latency_ms": round(self.latency_ms, 3) if self.latency_ms is not None else None,
+        }
@@ -0,0 +1,134 @@
+"""판정 회귀 검사 - 질문 코퍼스를 실제 응답 경로(/ask)로 판정해 비교
+
+코퍼스는 학습된 오버라이드 질문, 이벤트 로그의 질문(있으면), 고정 회귀 사례,
+단어/어미 조합으로 만든 질문과 그 변형(물음표, 느낌표, 공백, 대소문자, 입니까/인가요 어미)입니다.
+변형들을 섞어 두 번씩 보내므로 캐시가 다른 변형의 판정을 돌려주면 드러납니다.
+
+    /ask 응답  ==  judge_question(원문)   (캐시/정식 표기/계층형 판정이 판정을 바꾸지 않는지)
+    --baseline : 다른 트리에서 --save로 저장한 판정과도 비교 (규칙 변경 전후 동일성)
+
+사용법:
+    python verdict_check.py
+    python verdict_check.py --save verdicts.json        # 변경 전 트리에서
+    python verdict_check.py --baseline verdicts.json    # 변경 후 트리에서
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+
+# 판정 규칙 목록과 독립적인 고정 단어 (상수 목록이 바뀌어도 코퍼스가 바뀌지 않도록)
+WORDS = [
+    "남자", "사막", "열기구", "성냥", "제비뽑기", "추락", "떨어져", "죽었", "뛰어내렸", "희생", "모래", "바구니",
+    "무게", "친구", "여행", "옷", "벗었", "입었", "상처", "골절", "다리", "갈비뼈", "피", "시체", "발견",
+    "낙타", "공룡", "기린", "사자", "외계인", "날씨", "오늘", "음식", "물", "목마름", "총", "칼", "독",
+    "비행기", "낙하산", "바람", "가스", "불", "부러진", "누워", "혼자", "사람", "나이", "왜", "언제", "어떻게",
+]
+ENDINGS = ["나요", "습니까", "입니까", "인가요", "했나요", "아닌가요", "아닙니까", "했어요", "었다", ""]
+SUBJECTS = ["남자는 ", "그는 ", "그것은 ", ""]
+
+# 과거에 잘못 판정된 적이 있는 질문
+REGRESSIONS = [
+    "hello world", "오늘 날씨 좋다", "abcdefgh", "~~~~~~ 사막", "그는 누워 있었다", "!!!!!! 남자",
+    "그것은 사람입니까", "그것은 사람인가요", "멍?", "멍??", "심장", "심장!", "남자는 옷을 벗었나요?",
+    "남자는 옷을 입었나요?", "남자는\n열기구를\n탔나요", "ㅋㅋㅋㅋㅋㅋ", "?", "남자 남자 남자 남자",
+]
+
+
+def variants(question: str):
+    """판정 규칙이 구분할 수 있는 표기 변형들 (정식 표기는 같음)"""
+    base = question.rstrip("?!. ")
+    forms = [question, base, base + "?", base + "??", base + "!", "  " + base.replace(" ", "  ") + " ?", base.upper()]
+    if base.endswith("인가요"):
+        forms.append(base[:-3] + "입니까")
+    elif base.endswith("나요"):
+        forms.append(base[:-2] + "습니까?")
+    return [form for form in dict.fromkeys(forms) if form.strip()]
+
+
+def build_corpus(app, count: int, seed: int, db_path=None) -> list:
+    rng = random.Random(seed)
+    questions = list(REGRESSIONS)
+    questions += [override["question"] for override in app.load_learned_overrides() if override.get("question")]
+    if db_path and os.path.exists(db_path):
+        from event_store import connect, top_questions
+        conn = connect(db_path, readonly=True)
+        try:
+            questions += [text for text, _ in top_questions(conn, count, "0000-00-00")]
+        finally:
+            conn.close()
+    for _ in range(count):
+        words = " ".join(rng.sample(WORDS, rng.randint(1, 3)))
+        questions.append(rng.choice(SUBJECTS) + words + rng.choice(ENDINGS))
+
+    corpus = [form for question in dict.fromkeys(questions) for form in variants(question)]
+    # 변형들이 서로 다른 순서로 캐시를 채우도록 섞음
+    rng.shuffle(corpus)
+    return [q for q in dict.fromkeys(q.strip() for q in corpus) if q and len(q) <= app.MAX_QUESTION_LENGTH]
+
+
+def _ask_all(app, client, corpus, served: dict, record: bool) -> list:
+    """코퍼스를 /ask로 보내 원문 판정과 다른 응답 목록 반환 (record면 응답을 served에 저장)"""
+    mismatches = []
+    for question in corpus:
+        response = client.post("/ask", json={"question": question})
+        if response.status_code != 200:
+            mismatches.append({"question": question, "status": response.status_code})
+            continue
+        body = response.get_json()
+        got = [body["result"], body["evidence"]]
+        if record:
+            served[question] = got
+        expected = app.judge_question(question)
+        if got != [expected["verdict"], expected.get("evidence", "")]:
+            mismatches.append({"question": question, "served": got,
+                               "direct": [expected["verdict"], expected.get("evidence", "")]})
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="판정 회귀 검사 (/ask 응답 경로)")
+    parser.add_argument("--count", type=int, default=1500, help="생성할 질문 수 (변형 제외)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db", default=None, help="질문을 더 가져올 이벤트 DB (기본: 사용하지 않음)")
+    parser.add_argument("--save", help="판정을 이 파일에 저장")
+    parser.add_argument("--baseline", help="--save로 저장한 판정과 비교")
+    args = parser.parse_args(argv)
+
+    from batch_judge import WORKER_ENV
+    os.environ.update(WORKER_ENV)
+    import app
+
+    corpus = build_corpus(app, args.count, args.seed, args.db)
+    client = app.app.test_client()
+    served = {}
+    mismatches = []
+    # 판정 함수의 디버그 출력은 보고서와 섞이지 않도록 버림
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for attempt in range(2):    # 두 번째는 캐시 적중
+            mismatches += _ask_all(app, client, corpus, served, attempt == 0)
+
+    baseline_diffs = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        baseline_diffs = [{"question": q, "baseline": baseline[q], "served": served.get(q)}
+                          for q in baseline if q in served and served[q] != baseline[q]]
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(served, f, ensure_ascii=False, indent=0)
+
+    report = {
+        "questions": len(corpus),
+        "served_vs_direct_mismatches": len(mismatches),
+        "baseline_mismatches": len(baseline_diffs) if args.baseline else None,
+        "examples": (mismatches + baseline_diffs)[:20],
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 1 if mismatches or baseline_diffs else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())